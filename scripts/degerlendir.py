@@ -3,14 +3,30 @@
 Elemantr vs Qwen lemmatizasyon değerlendirmesi.
 birlesik.tsv dosyasını okuyup her satırı etiketler, istatistik üretir.
 
-Kullanım: python degerlendir.py
+Kullanım: python degerlendir.py [-i birlesik.tsv] [-o degerlendirme.tsv] [-r rapor.txt] [-j N]
 Girdi: birlesik.tsv (aynı dizinde)
-Çıktı: degerlendirme.tsv  — her satır etiketli
-       rapor.txt          — özet istatistikler
+Çıktı: degerlendirme.tsv    — her satır etiketli
+       rapor.txt            — özet istatistikler
+       degerlendirme.sqlite — uyumsuzluk küpü: sayfa, lemma ve (elemantr, qwen) lemma
+                              çifti başına etiket sayaçları (sorgu: uyumsuzluk_sorgu.py)
+
+Satırlar akış halinde okunup yazılır (bellek dosya boyutundan bağımsız).
+-j N: dosya satır başlarına hizalı bayt aralıklarına bölünür, N process etiketler,
+      parçalar sırayla birleştirilir; sayaçlar toplanır (rapor tek process ile aynı).
+Birleştirmeyle tek geçişte: python birlestir.py --evaluate (aynı çıktılar, birlesik.tsv
+yeniden okunmaz).
 """
 
+import argparse
 import os
+import shutil
+import sqlite3
 import sys
+from bisect import bisect_right
+from functools import lru_cache
+from multiprocessing import Pool
+
+from normalizasyon import VOCAB, tr_lower
 
 
 # ─── Yardımcılar ─────────────────────────────────────────────
@@ -18,14 +34,21 @@ import sys
 PUNCT_CHARS = set('.,!?;:"\'-|()[]{}…–—«»/\\0123456789')
 
 
+@lru_cache(maxsize=None)
 def is_punct(token):
-    """Token sadece noktalama/rakam mı?"""
+    """Token sadece noktalama/rakam mı? (token'lar çok tekrar eder, sonuç önbellekte)"""
     return bool(token) and all(c in PUNCT_CHARS for c in token)
 
 
 def clean_lemma(lemma):
-    """Lemma'yı karşılaştırma için temizle: * sil, küçük harf, strip."""
-    return lemma.rstrip("*").lower().strip()
+    """Lemma'yı karşılaştırma için temizle: * sil, Türkçe küçük harf, strip."""
+    return tr_lower(lemma.rstrip("*")).strip()
+
+
+@lru_cache(maxsize=None)
+def lemma_id(lemma):
+    """Temizlenmiş lemma'nın VOCAB id'si; her farklı ham lemma bir kez temizlenir."""
+    return VOCAB.intern(clean_lemma(lemma))
 
 
 def has_star(lemma):
@@ -63,62 +86,272 @@ def label_row(et, el, qt, ql):
     if is_punct(et) or is_punct(qt):
         return "noktalama"
 
-    el_clean = clean_lemma(el)
-    ql_clean = clean_lemma(ql)
     star = has_star(el)
 
     # Lemmalar aynıysa → token veya yıldız farkı önemsiz, kesin doğru
-    if el_clean == ql_clean:
+    if lemma_id(el) == lemma_id(ql):
         return "ayni"
 
     # Lemmalar farklı
-    tokens_same = (et.lower() == qt.lower())
+    tokens_same = (VOCAB.id(et) == VOCAB.id(qt))
     if tokens_same:
         return "farkli_belirsiz" if star else "farkli"
     else:
         return "token_farkli_x"
 
 
-# ─── Ana akış ────────────────────────────────────────────────
+# ─── Uyumsuzluk küpü ─────────────────────────────────────────
+# Etiketleme geçişinde sayfa, elemantr lemma'sı ve (elemantr, qwen) lemma çifti
+# başına etiket sayaçları birikir ve SQLite'a yazılır (sorgu: uyumsuzluk_sorgu.py).
+# Sayfa sınırları birlestir.py manifest'indeki bayt ofsetlerinden gelir.
+
+EVAL_LABELS = ("ayni", "farkli", "farkli_belirsiz", "token_farkli_x")
+LABELS = EVAL_LABELS + ("bos_e", "bos_q", "noktalama", "bos")
+LABEL_INDEX = {label: i for i, label in enumerate(LABELS)}
+
+CUBE_SCHEMA = f"""
+CREATE TABLE meta (anahtar TEXT PRIMARY KEY, deger TEXT);
+CREATE TABLE etiket (etiket TEXT PRIMARY KEY, n INTEGER NOT NULL);
+CREATE TABLE sayfa (
+    sira INTEGER PRIMARY KEY,        -- birlesik.tsv'deki sayfa sırası
+    e_sayfa INTEGER, q_sayfa INTEGER,
+    {", ".join(f"{label} INTEGER NOT NULL" for label in LABELS)},
+    degerlendirilir INTEGER NOT NULL,
+    uyum REAL                         -- ayni / degerlendirilir
+);
+CREATE INDEX sayfa_uyum ON sayfa(uyum);
+CREATE INDEX sayfa_e ON sayfa(e_sayfa);
+CREATE TABLE lemma (
+    lemma TEXT PRIMARY KEY,          -- temizlenmiş elemantr lemma'sı
+    {", ".join(f"{label} INTEGER NOT NULL" for label in EVAL_LABELS)},
+    degerlendirilir INTEGER NOT NULL,
+    uyumsuz INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX lemma_uyumsuz ON lemma(uyumsuz DESC);
+CREATE TABLE cift (
+    e_lemma TEXT NOT NULL, q_lemma TEXT NOT NULL,
+    {", ".join(f"{label} INTEGER NOT NULL" for label in EVAL_LABELS[1:])},
+    n INTEGER NOT NULL,
+    PRIMARY KEY (e_lemma, q_lemma)
+) WITHOUT ROWID;
+CREATE INDEX cift_n ON cift(n DESC);
+CREATE INDEX cift_q ON cift(q_lemma);
+"""
 
-def main():
-    input_file = "birlesik.tsv"
-    output_file = "degerlendirme.tsv"
-    report_file = "rapor.txt"
 
-    if not os.path.exists(input_file):
-        print(f"HATA: {input_file} bulunamadı!")
-        sys.exit(1)
+def load_page_index(input_file):
+    """
+    birlestir manifest'inden sayfa başlangıç ofsetleri ve (elemantr, qwen) sayfa
+    numaraları; geçerli manifest yoksa (None, None) — küpte sayfa tablosu boş kalır.
+    """
+    from birlestir import read_manifest  # birlestir bu modülü içe aktarır (--evaluate)
+
+    manifest = read_manifest(input_file)
+    if manifest is None:
+        return None, None
+    pages = manifest["sayfalar"]
+    return [p[1] for p in pages], [(p[3], p[4]) for p in pages]
+
+
+class DisagreementCube:
+    """Tek geçişte biriken sayaçlar; worker'lardan gelenler merge ile toplanır."""
+
+    def __init__(self):
+        self.pages = {}    # sayfa sırası -> LABELS sırasıyla sayaçlar
+        self.lemmas = {}   # elemantr lemma -> EVAL_LABELS sayaçları
+        self.pairs = {}    # (elemantr lemma, qwen lemma) -> farklı etiket sayaçları
+
+    def add(self, label, el, ql, page=None):
+        """page: birlesik.tsv'deki sayfa sırası (0'dan), bilinmiyorsa None"""
+        k = LABEL_INDEX[label]
+        if page is not None:
+            counts = self.pages.get(page)
+            if counts is None:
+                counts = self.pages[page] = [0] * len(LABELS)
+            counts[k] += 1
+        if k >= len(EVAL_LABELS):
+            return
+        e_lemma = VOCAB.strings[lemma_id(el)]
+        counts = self.lemmas.get(e_lemma)
+        if counts is None:
+            counts = self.lemmas[e_lemma] = [0] * len(EVAL_LABELS)
+        counts[k] += 1
+        if k:
+            key = (e_lemma, VOCAB.strings[lemma_id(ql)])
+            counts = self.pairs.get(key)
+            if counts is None:
+                counts = self.pairs[key] = [0] * (len(EVAL_LABELS) - 1)
+            counts[k - 1] += 1
+
+    def merge(self, other):
+        for mine, theirs in ((self.pages, other.pages), (self.lemmas, other.lemmas),
+                             (self.pairs, other.pairs)):
+            for key, counts in theirs.items():
+                current = mine.get(key)
+                mine[key] = counts if current is None else [a + b for a, b in zip(current, counts)]
+
+    def write(self, path, input_file, counts, page_info):
+        """SQLite'a yaz (varsa üzerine); page_info: sayfa sırasıyla (elemantr, qwen) sayfa no"""
+        if os.path.exists(path):
+            os.remove(path)
+        conn = sqlite3.connect(path)
+        conn.executescript(CUBE_SCHEMA)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                         [("girdi", os.path.abspath(input_file)),
+                          ("sayfa_bilgisi", "var" if page_info else "yok")])
+        conn.executemany("INSERT INTO etiket VALUES (?, ?)",
+                         [(label, counts.get(label, 0)) for label in LABELS])
+        if page_info:
+            rows = []
+            for page, (e_no, q_no) in enumerate(page_info):
+                c = self.pages.get(page, [0] * len(LABELS))
+                evaluable = sum(c[:len(EVAL_LABELS)])
+                rows.append((page + 1, e_no, q_no, *c, evaluable,
+                             c[0] / evaluable if evaluable else None))
+            conn.executemany(f"INSERT INTO sayfa VALUES ({', '.join('?' * (len(LABELS) + 5))})",
+                             rows)
+        conn.executemany(f"INSERT INTO lemma VALUES ({', '.join('?' * (len(EVAL_LABELS) + 3))})",
+                         ((lemma, *c, sum(c), sum(c[1:])) for lemma, c in self.lemmas.items()))
+        conn.executemany(f"INSERT INTO cift VALUES ({', '.join('?' * (len(EVAL_LABELS) + 2))})",
+                         ((e, q, *c, sum(c)) for (e, q), c in self.pairs.items()))
+        conn.commit()
+        conn.close()
+
+
+# ─── Akış halinde etiketleme ─────────────────────────────────
+
+OUTPUT_HEADER = "elemantr_token\telemantr_lemma\tqwen_token\tqwen_lemma\tetiket\n"
+CHUNKS_PER_JOB = 4        # Paralel modda iş başına parça (yük dengesi)
+
+
+def iter_lines(path, start, end):
+    """[start, end) bayt aralığındaki satırlar: (bayt ofseti, satır sonu atılmış satır)"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        pos = start
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            # İkili okumada CRLF çevrilmez; \r son alana (ql) karışmasın
+            yield pos, line.rstrip(b"\r\n").decode("utf-8")
+            pos += len(line)
+
+
+def label_lines(lines, out, counts, cube=None, page_starts=None):
+    """
+    (ofset, satır) çiftlerini etiketle, out'a yaz; counts'u ve varsa küpü güncelle.
+    page_starts: sayfa başlangıç ofsetleri (birlestir manifest'i), satırın sayfası için.
+    """
+    for pos, line in lines:
+        parts = line.split("\t")
+        while len(parts) < 4:
+            parts.append("")
+        et, el, qt, ql = parts[0], parts[1], parts[2], parts[3]
+
+        label = label_row(et, el, qt, ql)
+        out.write("\t".join((et, el, qt, ql, label)) + "\n")
+        counts[label] = counts.get(label, 0) + 1
+        if cube is not None:
+            cube.add(label, el, ql, bisect_right(page_starts, pos) - 1 if page_starts else None)
 
-    # Sayaçlar
+
+def label_range(path, start, end, out, page_starts=None, with_cube=True):
+    """[start, end) aralığını etiketle -> (sayaçlar, küp veya None)"""
     counts = {}
-    total = 0
+    cube = DisagreementCube() if with_cube else None
+    label_lines(iter_lines(path, start, end), out, counts, cube, page_starts)
+    return counts, cube
 
-    # Oku ve etiketle
-    print(f"Okunuyor: {input_file}")
-    rows = []
-    with open(input_file, "r", encoding="utf-8") as f:
-        header = next(f).rstrip("\n")
-        for line in f:
-            parts = line.rstrip("\n").split("\t")
-            while len(parts) < 4:
-                parts.append("")
-            et, el, qt, ql = parts[0], parts[1], parts[2], parts[3]
-
-            label = label_row(et, el, qt, ql)
-            rows.append((et, el, qt, ql, label))
-
-            counts[label] = counts.get(label, 0) + 1
-            total += 1
-
-    # Etiketli dosya yaz
-    print(f"Yazılıyor: {output_file}")
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("elemantr_token\telemantr_lemma\tqwen_token\tqwen_lemma\tetiket\n")
-        for row in rows:
-            f.write("\t".join(row) + "\n")
-
-    # ─── Rapor ──────────────────────────────────────────
+
+def label_page(rows, cube, page=None):
+    """
+    birlestir --evaluate: bir sayfanın hizalanmış satırlarını etiketle, küpe ekle.
+    -> (birlesik.tsv metni, degerlendirme.tsv metni, sayaçlar)
+    """
+    counts = {}
+    merged, labelled = [], []
+    for et, el, qt, ql in rows:
+        label = label_row(et, el, qt, ql)
+        line = f"{et}\t{el}\t{qt}\t{ql}"
+        merged.append(line)
+        labelled.append(f"{line}\t{label}")
+        counts[label] = counts.get(label, 0) + 1
+        cube.add(label, el, ql, page)
+    if not rows:
+        return "", "", counts
+    return "\n".join(merged) + "\n", "\n".join(labelled) + "\n", counts
+
+
+def chunk_ranges(path, start, n_chunks):
+    """[start, dosya sonu) aralığını satır başlarına hizalı ~eşit bayt aralıklarına böl"""
+    size = os.path.getsize(path)
+    bounds = [start]
+    with open(path, "rb") as f:
+        for k in range(1, n_chunks):
+            target = start + (size - start) * k // n_chunks
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()  # target bir satırın ortasındaysa satır sonuna kadar atla
+            if f.tell() >= size:
+                break
+            if f.tell() > bounds[-1]:
+                bounds.append(f.tell())
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def label_chunk(args):
+    """Worker: bayt aralığını etiketle, part dosyasına yaz -> (sayaçlar, küp)"""
+    path, start, end, part_file, page_starts, with_cube = args
+    with open(part_file, "w", encoding="utf-8") as out:
+        return label_range(path, start, end, out, page_starts, with_cube)
+
+
+def data_start(input_file):
+    """Başlık satırından sonraki ilk baytın ofseti"""
+    with open(input_file, "rb") as f:
+        f.readline()
+        return f.tell()
+
+
+def label_parallel(input_file, output_file, jobs, page_starts=None, with_cube=True):
+    """Dosyayı bayt aralıklarına bölüp process havuzunda etiketle; parçaları sırayla birleştir"""
+    ranges = chunk_ranges(input_file, data_start(input_file), jobs * CHUNKS_PER_JOB)
+    tasks = [(input_file, s, e, f"{output_file}.part{k}", page_starts, with_cube)
+             for k, (s, e) in enumerate(ranges)]
+
+    counts = {}
+    cube = DisagreementCube() if with_cube else None
+    with open(output_file, "w", encoding="utf-8") as out, Pool(processes=jobs) as pool:
+        out.write(OUTPUT_HEADER)
+        out.flush()
+        for task, (part_counts, part_cube) in zip(tasks, pool.imap(label_chunk, tasks)):
+            part_file = task[3]
+            with open(part_file, "rb") as part:
+                shutil.copyfileobj(part, out.buffer)
+            os.remove(part_file)
+            for label, c in part_counts.items():
+                counts[label] = counts.get(label, 0) + c
+            if cube is not None:
+                cube.merge(part_cube)
+    return counts, cube
+
+
+def label_stream(input_file, output_file, page_starts=None, with_cube=True):
+    """Tek process: satır satır oku, etiketle, yaz (bellek sabit)"""
+    with open(output_file, "w", encoding="utf-8") as out:
+        out.write(OUTPUT_HEADER)
+        return label_range(input_file, data_start(input_file), os.path.getsize(input_file),
+                           out, page_starts, with_cube)
+
+
+# ─── Rapor ───────────────────────────────────────────────────
+
+def write_report(counts, report_file):
+    """Etiket sayaçlarından özet raporu yazdır ve report_file'a yaz"""
+    total = sum(counts.values())
     disi_birakilan = counts.get("noktalama", 0) + counts.get("bos", 0)
     bos_e = counts.get("bos_e", 0)
     bos_q = counts.get("bos_q", 0)
@@ -169,19 +402,12 @@ def main():
     pr()
 
     # Yıldızsız kesin sonuçlar ayrı
-    kesin = ayni + farkli  # yıldızsız + aynı token olanlar
-    # ayni içinde yıldızlı olanlar da var artık, onları sayalım
-    # Aslında ayni hepsini kapsıyor. Kesin alt küme için:
-    # ayni'dan yıldızlıları çıkaramayız çünkü label'da ayrım yok.
-    # Ama farkli kesin yıldızsız, farkli_belirsiz yıldızlı.
     pr(f"  Kesin uyumsuzluk (farkli, yıldızsız)   : {farkli:>8,}")
     pr(f"  Belirsiz uyumsuzluk (farkli_belirsiz)  : {farkli_belirsiz:>8,}")
     pr()
 
     pr("─── ETİKET DETAY ───")
-    for label in ["ayni", "farkli", "farkli_belirsiz",
-                   "token_farkli_x", "bos_e", "bos_q",
-                   "noktalama", "bos"]:
+    for label in LABELS:
         c = counts.get(label, 0)
         if c > 0:
             pr(f"  {label:<22s}: {c:>8,}  ({c/total*100:.1f}%)")
@@ -197,11 +423,53 @@ def main():
     pr("  bos_q            = Sadece elemantr'de var (tokenizasyon farkı)")
     pr("  noktalama        = Noktalama işareti (değerlendirme dışı)")
 
-    # Rapor dosyası yaz
     print(f"\nYazılıyor: {report_file}")
     with open(report_file, "w", encoding="utf-8") as f:
         f.write("\n".join(report_lines) + "\n")
 
+
+# ─── Ana akış ────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Elemantr vs Qwen lemmatizasyon değerlendirmesi")
+    parser.add_argument("--input", "-i", default="birlesik.tsv")
+    parser.add_argument("--output", "-o", default="degerlendirme.tsv")
+    parser.add_argument("--report", "-r", default="rapor.txt")
+    parser.add_argument("--cube", default="degerlendirme.sqlite",
+                        help="Uyumsuzluk küpü (sayfa / lemma / lemma çifti sayaçları; "
+                             "sorgu: uyumsuzluk_sorgu.py) (default: degerlendirme.sqlite)")
+    parser.add_argument("--no-cube", action="store_true", help="Küp oluşturma")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Paralel etiketleme process sayısı; >1 ise dosya bayt "
+                             "aralıklarına bölünür (default: 1, akış halinde tek process)")
+    args = parser.parse_args()
+
+    input_file = args.input
+    output_file = args.output
+    report_file = args.report
+
+    if not os.path.exists(input_file):
+        print(f"HATA: {input_file} bulunamadı!")
+        sys.exit(1)
+
+    # Oku, etiketle, yaz
+    print(f"Okunuyor: {input_file}")
+    with_cube = not args.no_cube
+    page_starts, page_info = load_page_index(input_file) if with_cube else (None, None)
+    print(f"Yazılıyor: {output_file}" + (f" ({args.jobs} process)" if args.jobs > 1 else ""))
+    if args.jobs > 1:
+        counts, cube = label_parallel(input_file, output_file, args.jobs, page_starts, with_cube)
+    else:
+        counts, cube = label_stream(input_file, output_file, page_starts, with_cube)
+
+    if cube is not None:
+        cube.write(args.cube, input_file, counts, page_info)
+        print(f"Yazılıyor: {args.cube} ({len(cube.lemmas):,} lemma, {len(cube.pairs):,} lemma çifti, "
+              + (f"{len(page_info):,} sayfa)" if page_info else
+                 "sayfa bilgisi yok — birlestir manifest'i bulunamadı)"))
+
+    write_report(counts, report_file)
+
     print("Tamamlandı!")
 
 
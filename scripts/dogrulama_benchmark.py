@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Token doğrulama mikro-benchmark'ı.
+Eski yöntem (her token için yeni regex + cümleyi her seferinde küçültme) ile
+SentenceIndex tabanlı filter_and_validate_tokens'ı gerçek cümleler üzerinde karşılaştırır.
+
+Kullanım:
+    python dogrulama_benchmark.py                                  # output/ince_memed_sozluk.tsv
+    python dogrulama_benchmark.py -i ince_memed_sozluk.json -n 200
+Girdi: ince_memed_v3_checkpoint.py'nin .json veya .tsv çıktısı
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+from ince_memed_v3_checkpoint import CONFIG, filter_and_validate_tokens
+
+
+# ─── Eski yöntem (karşılaştırma için birebir kopya) ──────────
+
+def validate_token_in_sentence_regex(token, sentence):
+    token_lower = token.lower().strip()
+    sentence_lower = sentence.lower()
+    if not token_lower:
+        return False
+    pattern = r'(?<![a-zA-ZçÇğĞıİöÖşŞüÜ])' + re.escape(token_lower) + r'(?![a-zA-ZçÇğĞıİöÖşŞüÜ])'
+    return bool(re.search(pattern, sentence_lower))
+
+
+def filter_and_validate_tokens_regex(tokens, sentence):
+    validated = []
+    for t in tokens:
+        token_text = t.get("token", "").strip()
+        lemma = t.get("lemma", "").lower().rstrip("-")
+        if lemma in CONFIG.stop_words or token_text.lower() in CONFIG.stop_words:
+            continue
+        if len(token_text) < 2:
+            continue
+        if re.match(r'^[.,!?;:"\'\-]+$', token_text):
+            continue
+        if not validate_token_in_sentence_regex(token_text, sentence):
+            continue
+        validated.append(t)
+    return validated
+
+
+# ─── Girdi ───────────────────────────────────────────────────
+
+def load_samples(path):
+    """[(cümle, [token dict, ...]), ...]"""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)["data"]
+        return [(r["cumle"], r["tokens"]) for r in data]
+
+    samples = {}
+    with open(path, encoding="utf-8") as f:
+        next(f)
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 7:
+                continue
+            cumle_id = parts[1]
+            if cumle_id not in samples:
+                samples[cumle_id] = (parts[6], [])
+            samples[cumle_id][1].append({"token": parts[2], "lemma": parts[3]})
+    return list(samples.values())
+
+
+def bench(fn, samples, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for sentence, tokens in samples:
+            fn(tokens, sentence)
+    return time.perf_counter() - t0
+
+
+# ─── Ana akış ────────────────────────────────────────────────
+
+def main():
+    default_input = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 "..", "output", "ince_memed_sozluk.tsv")
+    parser = argparse.ArgumentParser(description="Token doğrulama mikro-benchmark")
+    parser.add_argument("--input", "-i", default=default_input,
+                        help="Checkpoint çıktısı (.json veya .tsv)")
+    parser.add_argument("--repeat", "-n", type=int, default=500,
+                        help="Tekrar sayısı (default: 500)")
+    args = parser.parse_args()
+
+    samples = load_samples(args.input)
+    n_tokens = sum(len(t) for _, t in samples)
+    print(f"{len(samples)} cümle, {n_tokens} token, {args.repeat} tekrar")
+
+    diff = sum(1 for sentence, tokens in samples
+               if filter_and_validate_tokens(tokens, sentence)
+               != filter_and_validate_tokens_regex(tokens, sentence))
+
+    t_old = bench(filter_and_validate_tokens_regex, samples, args.repeat)
+    t_new = bench(filter_and_validate_tokens, samples, args.repeat)
+    total = n_tokens * args.repeat
+
+    print(f"  Regex (eski)    : {t_old:.3f}s  ({total / t_old:,.0f} token/s)")
+    print(f"  SentenceIndex   : {t_new:.3f}s  ({total / t_new:,.0f} token/s)")
+    print(f"  Hızlanma        : {t_old / t_new:.1f}x")
+    print(f"  Farklı sonuç    : {diff} cümle (beklenen tek kaynak: Türkçe İ/I küçültmesi)")
+
+
+if __name__ == "__main__":
+    main()
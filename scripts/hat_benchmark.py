@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Uçtan uca hat (pipeline) benchmark'ı — gerçek model olmadan.
+Sentetik sayfa metinleri üretir, cümlelere böler ve ince_memed_v3_checkpoint.py'nin
+SozVarligiProcessor'ını FakeBackend ile çalıştırır. Böylece LLM dışındaki maliyet
+(cümle bölme, doğrulama, checkpoint yazımı, JSON/TSV dışa aktarımı) ölçülür.
+
+Her boyut ayrı bir process'te çalışır (tepe RSS birbirini etkilemesin).
+Raporlanan:
+    cümle/s        : toplam cümle / (bölme + işleme) süresi
+    checkpoint     : save_checkpoint çağrılarında geçen süre (işlem döngüsünde; kayıtlar
+                     yalnızca arka plandaki günlük yazıcısının kuyruğuna eklenir)
+    yazma+fsync    : günlük yazıcı thread'inin diske yazma ve fsync süresi (döngüyle örtüşür)
+    kapanış        : compact (günlüğü kapatma + nihai çıktı, --output-format)
+    tepe RSS       : process'in en yüksek bellek kullanımı
+
+Kullanım:
+    python hat_benchmark.py                          # 1k, 10k, 100k cümle
+    python hat_benchmark.py -n 1000 -n 10000 --pipeline
+    python hat_benchmark.py -n 10000 --latency 0.001 --failure-rate 0.05 -c 4
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from ince_memed_v3_checkpoint import (
+    CONFIG, OUTPUT_EXTENSIONS, FakeBackend, ResponseCache, SozVarligiProcessor,
+    preprocess_text, split_page_sentences,
+)
+
+WORDS = (
+    "Memed Çukurova Abdi ağa Hatçe İnce dağ toprak tarla köy eşkıya jandarma "
+    "değirmen ova pamuk diken deve at tüfek kurşun gece yıldız ateş ekin tezek "
+    "kaçtı baktı geldi gitti yürüdü bağırdı sustu ağladı güldü düşündü söyledi "
+    "yavaş yavaş birden sonra önce çok az büyük küçük kara ak sarı kızıl uzun "
+    "Dikenli Değirmenoluk Vayvay Topal Ali Recep Çavuş Cabbar Durmuş Seyran"
+).split()
+SENTENCES_PER_PAGE = 30
+
+
+# ─── Sentetik derlem ─────────────────────────────────────────
+
+def synthetic_pages(n_sentences, seed=0):
+    """PDF sayfasına benzeyen metinler: satır sonları, tireli bölünme, sayfa numarası"""
+    rng = random.Random(seed)
+    page_no = 0
+    while n_sentences > 0:
+        page_no += 1
+        lines, line = [], ""
+        for _ in range(min(SENTENCES_PER_PAGE, n_sentences)):
+            words = rng.choices(WORDS, k=rng.randint(5, 25))
+            sentence = " ".join(words).capitalize() + rng.choice(".....!?")
+            for word in sentence.split():
+                if len(line) + len(word) > 60:
+                    lines.append(line)
+                    line = ""
+                line = f"{line} {word}" if line else word
+        lines.append(line)
+        lines.append(str(page_no))
+        n_sentences -= SENTENCES_PER_PAGE
+        yield "\n".join(lines)
+
+
+def iter_synthetic_sentences(n_sentences, seed=0):
+    """iter_sentences_from_pdf ile aynı biçimde cümle sözlükleri"""
+    sentence_id = 0
+    for page_idx, text in enumerate(synthetic_pages(n_sentences, seed)):
+        for sent in split_page_sentences(preprocess_text(text)):
+            sentence_id += 1
+            yield {"cumle_id": sentence_id, "pdf_sayfa": page_idx + 1, "cumle": sent}
+
+
+# ─── Tek boyut (alt process) ─────────────────────────────────
+
+class TimedProcessor(SozVarligiProcessor):
+    """Checkpoint ve kapanış sürelerini ölçen SozVarligiProcessor"""
+
+    checkpoint_time = 0.0
+    checkpoint_count = 0
+    compact_time = 0.0
+    journal_write_time = 0.0
+
+    def save_checkpoint(self):
+        start = time.perf_counter()
+        super().save_checkpoint()
+        self.checkpoint_time += time.perf_counter() - start
+        self.checkpoint_count += 1
+
+    def compact(self):
+        journal = self.journal
+        start = time.perf_counter()
+        super().compact()
+        self.compact_time += time.perf_counter() - start
+        if journal is not None:  # compact günlüğü kapattı, yazıcı thread'i bitti
+            self.journal_write_time += journal.write_time
+
+
+def run_single(args):
+    """Bir boyutu ölç, sonucu JSON satırı olarak yazdır"""
+    CONFIG.checkpoint_interval = args.checkpoint_interval
+    CONFIG.retry_backoff = 0.0  # Sahte hatalarda beklemek ölçümü bozar
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = FakeBackend(latency=args.latency, failure_rate=args.failure_rate, seed=args.seed)
+        cache = None
+        if args.cache:
+            cache = ResponseCache(os.path.join(tmp, "cache.sqlite"), CONFIG.model, "",
+                                  {"temperature": CONFIG.temperature})
+        processor = TimedProcessor(output_prefix=os.path.join(tmp, "bench"),
+                                   concurrency=args.concurrency, batch_size=args.batch,
+                                   cache=cache, client=client)
+        processor.output_format = args.output_format
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            if args.pipeline:
+                processor.process_stream(iter_synthetic_sentences(args.single, args.seed),
+                                         verbose=False)
+                split_time = 0.0  # Akış modunda bölme LLM ile örtüşür
+            else:
+                sentences = list(iter_synthetic_sentences(args.single, args.seed))
+                split_time = time.perf_counter() - start
+                processor.process_sentences(sentences, verbose=False)
+            total = time.perf_counter() - start
+
+        out_bytes = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Linux'ta KB
+    print(json.dumps({
+        "cumle": processor.stats["toplam_cumle"],
+        "sure": total,
+        "bolme": split_time,
+        "checkpoint": processor.checkpoint_time,
+        "checkpoint_sayisi": processor.checkpoint_count,
+        "gunluk_yazma": processor.journal_write_time,
+        "kapanis": processor.compact_time,
+        "cikti_mb": out_bytes / 1e6,
+        "rss_mb": peak_rss / 1024,
+    }))
+
+
+# ─── Rapor ───────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Uçtan uca hat benchmark'ı (sahte LLM)")
+    parser.add_argument("-n", "--sentences", type=int, action="append", metavar="N",
+                        help="Cümle sayısı (tekrarlanabilir; default: 1000 10000 100000)")
+    parser.add_argument("--pipeline", action="store_true", help="process_stream (akış modu)")
+    parser.add_argument("-c", "--concurrency", type=int, default=1)
+    parser.add_argument("--batch", type=int, default=1, help="İstek başına en fazla cümle")
+    parser.add_argument("--output-format", choices=list(OUTPUT_EXTENSIONS), default="legacy",
+                        help="Nihai çıktı biçimi (default: legacy)")
+    parser.add_argument("--cache", action="store_true", help="SQLite yanıt önbelleğini dahil et")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Sahte backend gecikmesi, saniye (default: 0)")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Sahte backend hata oranı 0-1 (default: 0)")
+    parser.add_argument("--checkpoint-interval", type=int, default=CONFIG.checkpoint_interval)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        run_single(args)
+        return
+
+    sizes = args.sentences or [1000, 10000, 100000]
+    mode = "akış (--pipeline)" if args.pipeline else "liste"
+    print(f"🧪 Hat benchmark'ı: mod={mode}, çıktı={args.output_format}, "
+          f"eşzamanlılık={args.concurrency}, "
+          f"paket={args.batch}, gecikme={args.latency}s, hata oranı={args.failure_rate:.0%}, "
+          f"checkpoint her {args.checkpoint_interval} cümlede")
+    print()
+    print(f"{'Cümle':>8} {'Süre (s)':>9} {'Cümle/s':>9} {'Bölme (s)':>10} "
+          f"{'Checkpoint (s)':>15} {'Yazma+fsync (s)':>16} {'Kapanış (s)':>12} "
+          f"{'Çıktı (MB)':>11} {'Tepe RSS (MB)':>14}")
+    print("-" * 113)
+
+    child_args = [a for a in sys.argv[1:]]
+    for n in sizes:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *child_args, "--single", str(n)],
+            capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{n:>8,} ❌ Hata:\n{proc.stderr}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        per_cp = r["checkpoint"] / max(1, r["checkpoint_sayisi"]) * 1000
+        print(f"{r['cumle']:>8,} {r['sure']:>9.2f} {r['cumle'] / r['sure']:>9,.0f} "
+              f"{r['bolme']:>10.2f} {r['checkpoint']:>8.2f} ({per_cp:.2f}ms) "
+              f"{r['gunluk_yazma']:>16.2f} {r['kapanis']:>12.2f} {r['cikti_mb']:>11.1f} {r['rss_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
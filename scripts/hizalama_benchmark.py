@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Sayfa içi hizalama motorları benchmark'ı.
+birlestir.py'deki sezgisel hizalama (heuristic_links) ile bantlı DP hizalamayı
+(dp_links) aynı sayfa çiftleri üzerinde karşılaştırır: süre, en yavaş sayfa,
+bağlantı sayıları ve iki motorun elemantr token'ı başına uyumu.
+
+Kullanım:
+    python hizalama_benchmark.py                              # elemantr_sonuc.txt, qwen_sonuc.txt
+    python hizalama_benchmark.py -e e.txt -q q.txt -b 8 -b 16 -b 32
+"""
+
+import argparse
+import time
+
+from birlestir import (DP_BAND, dp_links, heuristic_links, match_pages, parse_file,
+                       split_pages, tok_eq)
+
+
+def page_pairs(elemantr_file, qwen_file):
+    pages_e = split_pages(parse_file(elemantr_file))
+    pages_q = split_pages(parse_file(qwen_file))
+    pairs = []
+    for ei, qi in match_pages(pages_e, pages_q):
+        if ei is not None and qi is not None and pages_e[ei] and pages_q[qi]:
+            pairs.append(([t for t, _ in pages_e[ei]], [t for t, _ in pages_q[qi]]))
+    return pairs
+
+
+def run(name, fn, pairs):
+    """Her sayfayı hizala -> (sonuç özeti, bağlantılar)"""
+    links = []
+    worst = 0.0
+    start = time.perf_counter()
+    for e_toks, q_toks in pairs:
+        t = time.perf_counter()
+        links.append(fn(e_toks, q_toks))
+        worst = max(worst, time.perf_counter() - t)
+    total = time.perf_counter() - start
+
+    linked = exact = 0
+    for (e_toks, q_toks), (e_to_q, _) in zip(pairs, links):
+        for ei, qi in enumerate(e_to_q):
+            if qi != -1:
+                linked += 1
+                exact += tok_eq(e_toks[ei], q_toks[qi])
+    return {"ad": name, "sure": total, "en_yavas": worst, "bagli": linked, "tam": exact}, links
+
+
+def agreement(pairs, links_a, links_b):
+    """Elemantr token'larının yüzde kaçı iki motorda aynı qwen token'ına (veya hiçbirine) bağlı"""
+    same = total = 0
+    for (e_toks, _), (a, _), (b, _) in zip(pairs, links_a, links_b):
+        same += sum(1 for x, y in zip(a, b) if x == y)
+        total += len(e_toks)
+    return same / total * 100 if total else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hizalama motorları benchmark'ı")
+    parser.add_argument("--elemantr", "-e", default="elemantr_sonuc.txt")
+    parser.add_argument("--qwen", "-q", default="qwen_sonuc.txt")
+    parser.add_argument("--band", "-b", type=int, action="append",
+                        help=f"DP bant genişliği (tekrarlanabilir; default: {DP_BAND})")
+    args = parser.parse_args()
+
+    pairs = page_pairs(args.elemantr, args.qwen)
+    n_e = sum(len(e) for e, _ in pairs)
+    n_q = sum(len(q) for _, q in pairs)
+    print(f"{len(pairs)} sayfa çifti, {n_e:,} elemantr / {n_q:,} qwen token\n")
+
+    base, base_links = run("heuristic", heuristic_links, pairs)
+    rows = [(base, 100.0)]
+    for band in args.band or [DP_BAND]:
+        result, links = run(f"dp (band {band})", lambda e, q: dp_links(e, q, band), pairs)
+        rows.append((result, agreement(pairs, base_links, links)))
+
+    print(f"{'Motor':<16} {'Süre (s)':>9} {'Sayfa/s':>9} {'En yavaş (ms)':>14} "
+          f"{'Bağlı':>9} {'Tam eşit':>9} {'Uyum %':>8}")
+    print("-" * 80)
+    for r, agree in rows:
+        print(f"{r['ad']:<16} {r['sure']:>9.2f} {len(pairs) / r['sure']:>9.1f} "
+              f"{r['en_yavas'] * 1000:>14.1f} {r['bagli']:>9,} {r['tam']:>9,} {agree:>8.1f}")
+    print("\nBağlı: karşılığı bulunan elemantr token'ı; Tam eşit: bunların token'ı "
+          "(büyük/küçük harf hariç) aynı olanlar;\nUyum: elemantr token'larının heuristic "
+          "ile aynı qwen token'ına (veya hiçbirine) bağlandığı oran.")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,36 @@ Yeni özellikler:
 - Her 10 cümlede otomatik kayıt (checkpoint)
 - Varolan dosyadan devam etme (resume)
 - Hata durumunda kaldığı yerden devam
+- Checkpoint'ler yalnızca yeni kayıtları JSONL günlüğüne ekler (<output>.journal.jsonl),
+  JSON/TSV çıktıları çalışma sonunda tek seferde üretilir
+- Eşzamanlı LLM istekleri (--concurrency N), sonuçlar cumle_id sırasıyla kaydedilir
+- Akan yanıtlar (--stream): JSON token listesi geldikçe çözülür; token sayısı
+  cümle uzunluğunu aşarsa veya token'lar cümleyle eşleşmeyi bırakırsa üretim kesilir,
+  num_predict cümle uzunluğundan hesaplanır
+- Ollama sayaçları (prompt_eval_*, eval_*, load_duration) cümle başına
+  <output>.metrics.csv'ye, özetleri <output>.metrics.prom'a yazılır
+- Birden fazla Ollama sunucusu (--host URL, tekrarlanabilir): her istek en az yüklü
+  sağlıklı sunucuya gider, art arda hata veren veya modeli olmayan sunucu çıkarılır
+- Başarısız cümleler geri çekilmeli (backoff) yeniden denenir, olmazsa virgüllerden
+  bölünerek işlenir; yine olmazsa <output>.dlq.jsonl dosyasına yazılır. Deneme hakkı
+  bitmiş veya boş sonuç vermiş cümleler devam ederken atlanır
+- Çok cümleli istekler (--batch N): kısa cümleler cumle_id etiketiyle tek istekte
+  gönderilir, yanıt cümlelere geri bölünür; bozuk yanıtta tek tek işlenir
+- PDF sayfaları process havuzunda paralel çıkarılır (--pdf-workers N)
+- Çıkarılmış sayfa metinleri diskte önbelleklenir, sonraki çalıştırmalarda
+  pdfplumber yalnızca yeni sayfalar için çağrılır (--no-page-cache ile kapatılır)
+- Akış modu (--pipeline): çıkarım, LLM, doğrulama ve kayıt sınırlı kuyruklarla
+  bağlı ayrı aşamalarda çalışır; her aşamanın hızı ve kuyruk doluluğu raporlanır
+- Checkpoint günlüğü anahtarsız satırlar yazar (cümle + token dizileri); nihai çıktı
+  eski JSON/TSV yerine normalleştirilmiş SQLite veya sütunlu ikili dosya olabilir
+  (--output-format sqlite|columnar), sonuc_donustur.py eski biçimi yeniden üretir
+- İstek seçenekleri planlama (--plan-options): num_ctx / num_predict cümle veya
+  paket uzunluğuna göre küçük kova kümelerinden seçilir; kesilen yanıt bir üst
+  num_predict kovasıyla tekrar istenir, kova kullanımı ve kesilme oranı raporlanır
+- Sahte backend (--fake-backend): model olmadan uçtan uca test, gecikme ve hata
+  oranı ayarlanabilir (--fake-latency, --fake-failure-rate); bkz. hat_benchmark.py
+- Kalıcı LLM yanıt önbelleği (SQLite): aynı cümle + model + ayarlar tekrar sorulmaz
+  (--no-cache ile kapatılır, --cache-only ile yalnızca önbellekten okunur)
 
 Değişiklikler:
 - System prompt Modelfile'da gömülü (yasar-sozluk modeli)
@@ -25,15 +55,40 @@ Kullanım:
     
     # Tam çalıştırma
     python ince_memed_v3_checkpoint.py --full
+    
+    # Tam çalıştırma, istek başına en fazla 8 cümle
+    python ince_memed_v3_checkpoint.py --full --batch 8
+    
+    # Tam çalıştırma, aynı anda 4 istek (sunucuda OLLAMA_NUM_PARALLEL >= 4 olmalı)
+    python ince_memed_v3_checkpoint.py --full --concurrency 4
+    
+    # Parça: yalnızca 51-100. PDF sayfaları (parçalı çalışma için bkz. parca_yonetici.py)
+    python ince_memed_v3_checkpoint.py --pages 51-100 -o parcalar/cilt1.0051-0100
 """
 
 import argparse
 import json
+import hashlib
+import mmap
 import os
+import queue
+import random
 import re
+import sqlite3
+import string
+import struct
 import sys
+import threading
 import time
+import unicodedata
+import zlib
+from array import array
+from collections import deque
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool, cpu_count
 from pathlib import Path
+from types import SimpleNamespace
 from dataclasses import dataclass, field
 
 import pdfplumber
@@ -45,7 +100,47 @@ import ollama
 class Config:
     model: str = "yasar-sozluk"  # Modelfile ile oluşturulan özel model
     temperature: float = 0.2
+    num_predict: int = 1500  # Akış modunda üst sınır; asıl değer cümle uzunluğundan
+    
+    # Akan (stream) yanıtlar ve kaçak üretimi erken durdurma
+    stream: bool = False
+    stream_token_ratio: float = 1.0  # Cümledeki kelime başına en fazla token
+    stream_token_slack: int = 3
+    stream_max_misses: int = 3  # Art arda cümlede bulunmayan token sayısı
     checkpoint_interval: int = 10  # Her kaç cümlede bir kayıt
+    concurrency: int = 1  # Aynı anda Ollama'ya gönderilen en fazla istek
+    pdf_workers: int = 0  # PDF çıkarımı için process sayısı (0 = CPU sayısı - 1)
+    page_cache_dir: str = ".sayfa_onbellek"  # Çıkarılmış sayfa metinleri ("" = kapalı)
+    pipeline_queue_size: int = 64  # Akış modunda aşamalar arası kuyruk kapasitesi
+    
+    # LLM telemetrisi
+    telemetry_window: int = 50  # Kayan hız penceresi (istek)
+    reload_threshold: float = 1.0  # load_duration bu kadar saniyeyi aşarsa model yeniden yüklendi say
+    
+    # Birden fazla Ollama sunucusu
+    backend_max_failures: int = 3  # Art arda bu kadar hatada sunucu rotasyondan çıkar
+    backend_cooldown: float = 60.0  # Saniye; sonra sunucu yeniden denenir
+    
+    # Yeniden deneme ve ölü mektup (dead-letter) kuyruğu
+    retry_attempts: int = 3  # Oturum içinde cümle başına deneme
+    retry_backoff: float = 2.0  # Saniye; her denemede iki katına çıkar
+    dead_letter_max_attempts: int = 6  # Oturumlar boyunca toplam; aşılınca cümle atlanır
+    
+    # Çok cümleli istekler
+    batch_size: int = 1  # İstek başına en fazla cümle (1 = kapalı)
+    batch_window: int = 64  # Uzunluğa göre gruplanan ardışık cümle penceresi
+    system_prompt_tokens: int = 1200  # Modelfile SYSTEM iletisi için ayrılan bağlam
+    output_tokens_per_word: int = 25  # JSON çıktısında kelime başına tahmini token
+    
+    # İstek başına num_ctx / num_predict planlama (--plan-options)
+    plan_options: bool = False
+    ctx_buckets: tuple = (2048, 4096, 8192)
+    predict_buckets: tuple = (256, 512, 1024, 2048, 4096)
+    ctx_hold: int = 200  # Küçük num_ctx kovasına inmeden önce sığması gereken ardışık istek
+    
+    # LLM yanıt önbelleği
+    cache_file: str = "llm_cache.sqlite"
+    cache_max_mb: int = 512  # Aşılınca en uzun süre kullanılmayan kayıtlar silinir
     
     # Stop list
     stop_words: set = field(default_factory=lambda: {
@@ -69,6 +164,15 @@ class Config:
 
 CONFIG = Config()
 
+
+def tr_lower(s: str) -> str:
+    """Türkçe uyumlu lowercase — İ→i, I→ı"""
+    return s.replace('İ', 'i').replace('I', 'ı').lower()
+
+
+# Stop list, Türkçe küçük harfe çevrilmiş, O(1) üyelik için
+STOP_WORDS = frozenset(tr_lower(w) for w in CONFIG.stop_words)
+
 # ============== PDF EXTRACTION ==============
 
 def preprocess_text(text: str) -> str:
@@ -79,78 +183,285 @@ def preprocess_text(text: str) -> str:
     return text
 
 
-def extract_sentences_from_pdf(pdf_path: str, start_page: int = 0, end_page: int = None, 
-                                max_sentences: int = None) -> list[dict]:
+def split_page_sentences(text: str) -> list[str]:
+    """Tek sayfanın ön işlenmiş (preprocess_text) metnini geçerli cümlelere böl"""
+    if not text.strip():
+        return []
+    
+    # Satır sonu tire birleştirme
+    text = re.sub(r'(\w)-\s*\n\s*(\w)', r'\1\2', text)
+    
+    # Satır içi sayfa numaralarını temizle
+    text = re.sub(r'\n\s*\d{1,4}\s*\n', '\n', text)
+    
+    # Satır sonlarını boşluğa çevir
+    text = re.sub(r'\n+', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    
+    # Cümlelere böl
+    raw_sentences = re.split(r'(?<=[.!?])\s+', text)
+    
+    sentences = []
+    for sent in raw_sentences:
+        sent = sent.strip()
+        # Geçerli cümle mi?
+        if len(sent) > 15 and re.search(r'[a-zA-ZçÇğĞıİöÖşŞüÜ]{4,}', sent):
+            sentences.append(sent)
+    return sentences
+
+
+class PageTextCache:
     """
-    PDF'den cümleleri çıkar.
-    Returns: [{"pdf_sayfa": 5, "cumle": "..."}, ...]
+    PDF sayfa metinleri için disk önbelleği (preprocess_text uygulanmış hali).
+    PDF başına tek dosya: <dir>/<pdf sha256>.pages
+    
+    Dosya düzeni:
+        başlık   : b"IMPC" + sayfa sayısı (uint32)
+        tablo    : her sayfa için (offset uint64, uzunluk uint32); offset 0 = yok
+        veri     : UTF-8 sayfa metinleri, sona eklenir
+    Okuma mmap ile yapılır; yazan tek taraf ana process'tir.
     """
-    sentences = []
-    sentence_id = 0
+    MAGIC = b"IMPC"
+    HEADER = struct.Struct("<4sI")
+    ENTRY = struct.Struct("<QI")
     
-    with pdfplumber.open(pdf_path) as pdf:
-        if end_page is None:
-            end_page = len(pdf.pages)
+    def __init__(self, cache_dir: str, pdf_path: str, n_pages: int):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, f"{file_sha256(pdf_path)}.pages")
+        self.n_pages = n_pages
+        self.hits = 0
+        self.misses = 0
         
-        for page_idx in range(start_page, min(end_page, len(pdf.pages))):
-            text = pdf.pages[page_idx].extract_text() or ""
-            if not text.strip():
-                continue
-            
-            pdf_sayfa = page_idx + 1  # 1-indexed
-            
-            # Pre-processing
-            text = preprocess_text(text)
-            
-            # Satır sonu tire birleştirme
-            text = re.sub(r'(\w)-\s*\n\s*(\w)', r'\1\2', text)
-            
-            # Satır içi sayfa numaralarını temizle
-            text = re.sub(r'\n\s*\d{1,4}\s*\n', '\n', text)
-            
-            # Satır sonlarını boşluğa çevir
-            text = re.sub(r'\n+', ' ', text)
-            text = re.sub(r'\s+', ' ', text)
-            
-            # Cümlelere böl
-            raw_sentences = re.split(r'(?<=[.!?])\s+', text)
-            
-            for sent in raw_sentences:
-                sent = sent.strip()
-                # Geçerli cümle mi?
-                if len(sent) > 15 and re.search(r'[a-zA-ZçÇğĞıİöÖşŞüÜ]{4,}', sent):
+        if not os.path.exists(self.path):
+            with open(self.path, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, n_pages))
+                f.write(b"\0" * self.ENTRY.size * n_pages)
+        
+        self._file = open(self.path, 'r+b')
+        magic, stored_pages = self.HEADER.unpack(self._file.read(self.HEADER.size))
+        if magic != self.MAGIC or stored_pages != n_pages:
+            raise ValueError(f"Geçersiz sayfa önbelleği: {self.path}")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def _entry_pos(self, page_idx: int) -> int:
+        return self.HEADER.size + page_idx * self.ENTRY.size
+    
+    def get(self, page_idx: int) -> str:
+        """Önbellekteki sayfa metni, yoksa None"""
+        offset, length = self.ENTRY.unpack_from(self._mm, self._entry_pos(page_idx))
+        if offset == 0 or offset + length > len(self._mm):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._mm[offset:offset + length].decode('utf-8')
+    
+    def put(self, page_idx: int, text: str):
+        data = text.encode('utf-8')
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(data)
+        # Tablo girdisi veriden sonra yazılır: kesintide yarım sayfa görünmez
+        self._file.flush()
+        self._file.seek(self._entry_pos(page_idx))
+        self._file.write(self.ENTRY.pack(offset, len(data)))
+        self._file.flush()
+    
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+_worker_pdf = None  # Her worker process'te bir kez açılan PDF
+
+
+def _init_pdf_worker(pdf_path: str):
+    global _worker_pdf
+    _worker_pdf = pdfplumber.open(pdf_path)
+
+
+def _extract_page(page_idx: int) -> tuple[int, str]:
+    """Worker: tek sayfanın metnini çıkar, OCR düzeltmelerini uygula"""
+    page = _worker_pdf.pages[page_idx]
+    text = page.extract_text() or ""
+    page.close()  # pdfplumber sayfa önbelleğini bırak, bellek düz kalsın
+    return page_idx, preprocess_text(text)
+
+
+def imap_bounded(pool, func, tasks, window):
+    """
+    Sıralı imap, en fazla window görev uçuşta. Pool.imap tüm görevleri baştan
+    gönderir ve biten sonuçları sınırsız tamponlar (LLM darboğazken bellek derlemle
+    büyür); burada yeni görev ancak en eski sonuç alındıkça gönderilir.
+    """
+    inflight = deque()
+    for task in tasks:
+        inflight.append(pool.apply_async(func, (task,)))
+        if len(inflight) >= window:
+            yield inflight.popleft().get()
+    while inflight:
+        yield inflight.popleft().get()
+
+
+def iter_sentences_from_pdf(pdf_path: str, start_page: int = 0, end_page: int = None,
+                            max_sentences: int = None, workers: int = None,
+                            cache_dir: str = None):
+    """
+    PDF'den cümleleri sayfa sırasıyla üreten generator döndür.
+    Önbellekte olmayan sayfalar bir process havuzunda paralel çıkarılır (en fazla
+    4 × worker sayfa uçuşta); her sayfa, kendinden önceki sayfalar bittiği anda
+    yield edilir. cumle_id numaralandırması sıralı çıkarımla birebir aynıdır.
+    Havuz bu çağrıda kurulur, generator'ın ilk adımında değil: process_stream'de
+    fork, aşama thread'leri başlamadan ana thread'de yapılır.
+    Yields: {"cumle_id": 1, "pdf_sayfa": 5, "cumle": "..."}
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        n_pages = len(pdf.pages)
+    if end_page is None:
+        end_page = n_pages
+    page_indices = range(start_page, min(end_page, n_pages))
+    
+    cache_dir = CONFIG.page_cache_dir if cache_dir is None else cache_dir
+    cache = PageTextCache(cache_dir, pdf_path, n_pages) if cache_dir else None
+    cached = {}
+    if cache is not None:
+        for page_idx in page_indices:
+            text = cache.get(page_idx)
+            if text is not None:
+                cached[page_idx] = text
+    missing = [i for i in page_indices if i not in cached]
+    
+    workers = workers or CONFIG.pdf_workers or max(1, cpu_count() - 1)
+    workers = min(workers, max(1, len(missing)))
+    
+    pool = None
+    in_process = False
+    if not missing:
+        extracted = iter(())
+    elif workers <= 1:
+        _init_pdf_worker(pdf_path)
+        in_process = True
+        extracted = map(_extract_page, missing)
+    else:
+        pool = Pool(processes=workers, initializer=_init_pdf_worker, initargs=(pdf_path,))
+        extracted = imap_bounded(pool, _extract_page, missing, workers * 4)
+    
+    def generate():
+        sentence_id = 0
+        n_extracted = 0  # Havuzdan gerçekten alınan sayfa (erken durmada len(missing)'ten az)
+        try:
+            for page_idx in page_indices:
+                if page_idx in cached:
+                    text = cached.pop(page_idx)
+                else:
+                    _, text = next(extracted)
+                    n_extracted += 1
+                    if cache is not None:
+                        cache.put(page_idx, text)
+                
+                pdf_sayfa = page_idx + 1  # 1-indexed
+                for sent in split_page_sentences(text):
                     sentence_id += 1
-                    sentences.append({
+                    yield {
                         "cumle_id": sentence_id,
                         "pdf_sayfa": pdf_sayfa,
                         "cumle": sent
-                    })
+                    }
                     
                     # Max sentence kontrolü
-                    if max_sentences and len(sentences) >= max_sentences:
-                        return sentences
+                    if max_sentences and sentence_id >= max_sentences:
+                        return
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            elif in_process:
+                _worker_pdf.close()
+            if cache is not None:
+                print(f"📄 Sayfa önbelleği: {cache.hits}/{len(page_indices)} sayfa önbellekten, "
+                      f"{n_extracted} sayfa pdfplumber ile çıkarıldı")
+                cache.close()
     
-    return sentences
+    return generate()
+
+
+def extract_sentences_from_pdf(pdf_path: str, start_page: int = 0, end_page: int = None, 
+                                max_sentences: int = None, workers: int = None,
+                                cache_dir: str = None) -> list[dict]:
+    """
+    PDF'den cümleleri çıkar (tam liste). main bunun yerine iter_sentences_from_pdf'i
+    doğrudan işler; liste yalnızca tüm cümlelere önceden ihtiyaç duyan çağıranlar için.
+    Returns: [{"pdf_sayfa": 5, "cumle": "..."}, ...]
+    """
+    return list(iter_sentences_from_pdf(pdf_path, start_page, end_page, max_sentences,
+                                        workers, cache_dir))
 
 
 # ============== LLM PROCESSING ==============
 
-def process_single_sentence(sentence: str, model: str) -> dict:
+METRIC_FIELDS = ("prompt_eval_count", "prompt_eval_duration", "eval_count",
+                 "eval_duration", "load_duration")
+
+
+def response_metrics(response) -> dict:
+    """Ollama yanıtındaki sayaçlar (süreler nanosaniye)"""
+    return {k: getattr(response, k, None) or 0 for k in METRIC_FIELDS}
+
+
+def add_metrics(total: dict, metrics: dict) -> dict:
+    """Birden fazla isteğin (yeniden deneme, parça) sayaçlarını topla"""
+    for k, v in (metrics or {}).items():
+        total[k] = total.get(k, 0) + v
+    return total
+
+
+def request_metrics(result: dict) -> list[dict]:
+    """
+    Sonucu üreten HTTP isteklerinin bölünmemiş sayaçları, istek başına bir sözlük.
+    "metrics" cümleye düşen paydır (toplu istekte bölünmüş, yeniden denemede toplanmış);
+    "requests" alanı yoksa sonuç tek bir isteğin yanıtıdır.
+    """
+    if "requests" in result:
+        return result["requests"]
+    return [result["metrics"]] if result.get("metrics") else []
+
+
+def process_single_sentence(sentence: str, model: str, client=ollama) -> dict:
     """
     Tek cümleyi işle. System prompt modelde gömülü.
+    client: ollama modülü (varsayılan sunucu), ollama.Client veya BackendPool
     """
+    if CONFIG.stream:
+        return process_single_sentence_stream(sentence, model, client)
+    
+    options = request_options(sentence, plan_num_predict(sentence, cap=False), CONFIG.num_predict)
+    metrics = {}
     try:
-        response = ollama.chat(
-            model=model,
-            messages=[
-                {"role": "user", "content": sentence}
-            ],
-            format="json",
-            options={
-                "temperature": CONFIG.temperature,
-                "num_predict": 1500
-            }
-        )
+        # Her kovada en fazla bir deneme: escalate büyütemezse ya da kovalar
+        # biterse son (kesik) yanıtla aşağıdaki JSON / dead-letter yoluna düşülür
+        for _ in range(len(CONFIG.predict_buckets)):
+            response = client.chat(
+                model=model,
+                messages=[
+                    {"role": "user", "content": sentence}
+                ],
+                format="json",
+                options=options
+            )
+            add_metrics(metrics, response_metrics(response))
+            # num_predict sınırında kesilen yanıt bir üst kovayla tekrar istenir
+            if not OPTION_PLANNER.record(options, response):
+                break
+            options = OPTION_PLANNER.escalate(sentence, options)
+            if options is None:
+                break
         
         raw_output = response['message']['content']
         
@@ -159,42 +470,496 @@ def process_single_sentence(sentence: str, model: str) -> dict:
             return {
                 "success": True,
                 "tokens": data.get("tokens", []),
-                "raw": raw_output
+                "raw": raw_output,
+                "metrics": metrics
             }
         except json.JSONDecodeError as e:
-            return {"success": False, "error": f"JSON parse: {e}", "raw": raw_output}
+            return {"success": False, "error_type": "json", "error": f"JSON parse: {e}",
+                    "raw": raw_output, "metrics": metrics}
             
+    except NoBackendError:
+        raise
     except Exception as e:
-        return {"success": False, "error": str(e), "raw": ""}
+        return {"success": False, "error_type": "istek", "error": str(e), "raw": ""}
 
 
-def validate_token_in_sentence(token: str, sentence: str) -> bool:
+class TokenStreamParser:
     """
-    Token cümlede KELIME olarak var mı? (substring değil)
+    Akan JSON yanıtındaki "tokens" dizisini artımlı çöz.
+    feed() her parçada yeni tamamlanan token nesnelerini döndürür.
     """
-    token_lower = token.lower().strip()
-    sentence_lower = sentence.lower()
     
-    # Boş token
-    if not token_lower:
-        return False
+    def __init__(self):
+        self.text = ""
+        self.pos = None  # "tokens": [ sonrasındaki tarama konumu
+        self.depth = 0  # Dizi içindeki iç içe derinlik
+        self.in_string = False
+        self.escape = False
+        self.obj_start = None
+        self.closed = False
+    
+    def feed(self, chunk: str) -> list[dict]:
+        self.text += chunk
+        if self.pos is None:
+            m = re.search(r'"tokens"\s*:\s*\[', self.text)
+            if not m:
+                return []
+            self.pos = m.end()
+        
+        out = []
+        text = self.text
+        i = self.pos
+        while i < len(text) and not self.closed:
+            c = text[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == '\\':
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+            elif c == '"':
+                self.in_string = True
+            elif c in '{[':
+                if self.depth == 0:
+                    self.obj_start = i
+                self.depth += 1
+            elif c in '}]':
+                if self.depth == 0:
+                    self.closed = True  # tokens dizisi bitti
+                    break
+                self.depth -= 1
+                if self.depth == 0 and self.obj_start is not None:
+                    try:
+                        out.append(json.loads(text[self.obj_start:i + 1]))
+                    except ValueError:
+                        pass
+                    self.obj_start = None
+            i += 1
+        self.pos = i
+        return out
+
+
+def plan_num_predict(sentence: str, cap: bool = True) -> int:
+    """Cümle uzunluğundan num_predict; cap ise CONFIG.num_predict üst sınırdır"""
+    need = estimate_output_tokens(sentence) * 3 // 2 + 64
+    return min(CONFIG.num_predict, need) if cap else need
+
+
+def process_single_sentence_stream(sentence: str, model: str, client=ollama) -> dict:
+    """
+    Tek cümleyi akan yanıtla işle. Token'lar geldikçe çözülür; model cümledeki
+    kelime sayısından fazla token üretirse ya da art arda cümlede olmayan token'lar
+    üretmeye başlarsa bağlantı kesilir ve o ana kadarki token'lar döndürülür.
+    """
+    index = SentenceIndex(sentence)
+    max_tokens = int(len(sentence.split()) * CONFIG.stream_token_ratio) + CONFIG.stream_token_slack
+    parser = TokenStreamParser()
+    tokens = []
+    parts = []
+    misses = 0
+    aborted = None
+    metrics = {}  # Son parçada gelir; erken kesilen akışta boş kalır
+    options = request_options(sentence, plan_num_predict(sentence, cap=False),
+                              plan_num_predict(sentence))
+    last = None
+    
+    try:
+        stream = client.chat(
+            model=model,
+            messages=[
+                {"role": "user", "content": sentence}
+            ],
+            format="json",
+            stream=True,
+            options=options
+        )
+        try:
+            for chunk in stream:
+                piece = chunk['message']['content']
+                parts.append(piece)
+                if chunk.get('done'):
+                    metrics = response_metrics(chunk)
+                    last = chunk
+                for t in parser.feed(piece):
+                    tokens.append(t)
+                    token_text = t.get("token", "") if isinstance(t, dict) else ""
+                    misses = 0 if index.contains(str(token_text)) else misses + 1
+                    if len(tokens) > max_tokens:
+                        aborted = f"token sınırı aşıldı ({max_tokens})"
+                    elif misses >= CONFIG.stream_max_misses:
+                        aborted = f"{misses} token art arda cümlede yok"
+                if aborted:
+                    break
+        finally:
+            # Akışı kapatmak HTTP bağlantısını keser, Ollama üretimi durdurur
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+            OPTION_PLANNER.record(options, last)
+    except NoBackendError:
+        raise
+    except Exception as e:
+        return {"success": False, "error_type": "istek", "error": str(e), "raw": "".join(parts)}
+    
+    raw_output = "".join(parts)
+    if aborted:
+        return {"success": True, "tokens": tokens, "raw": raw_output, "aborted": aborted,
+                "metrics": metrics}
+    
+    try:
+        data = json.loads(raw_output)
+        return {
+            "success": True,
+            "tokens": data.get("tokens", []),
+            "raw": raw_output,
+            "metrics": metrics
+        }
+    except json.JSONDecodeError as e:
+        # num_predict sınırında kesilmiş yanıt: tamamlanmış token'lar kullanılabilir
+        if tokens:
+            return {"success": True, "tokens": tokens, "raw": raw_output,
+                    "aborted": "yanıt yarım kaldı", "metrics": metrics}
+        return {"success": False, "error_type": "json", "error": f"JSON parse: {e}",
+                "raw": raw_output, "metrics": metrics}
+
+
+def split_at_commas(sentence: str) -> list[str]:
+    """Sorunlu cümleyi virgül/noktalı virgülden anlamlı parçalara böl"""
+    parts = [p.strip() for p in re.split(r'[,;]\s*', sentence)]
+    parts = [p for p in parts if len(p) > 3]
+    return parts if len(parts) >= 2 else []
+
+
+def process_sentence_with_retry(sentence: str, model: str, client=ollama) -> dict:
+    """
+    process_single_sentence + yeniden deneme politikası.
+    Başarısız istek CONFIG.retry_attempts kez (en az bir kez), artan bekleme
+    süreleriyle tekrarlanır.
+    Hâlâ başarısızsa cümle virgüllerden bölünür ve parçalar ayrı ayrı işlenir
+    (degraded); en az bir parça başarılıysa token'lar birleştirilir.
+    Sonuçtaki "attempts" alanı bu çağrıdaki toplam istek sayısıdır.
+    """
+    attempts = 0
+    metrics = {}
+    requests = []
+    for attempt in range(max(1, CONFIG.retry_attempts)):
+        if attempt:
+            time.sleep(CONFIG.retry_backoff * 2 ** (attempt - 1))
+        result = process_single_sentence(sentence, model, client)
+        attempts += 1
+        add_metrics(metrics, result.get("metrics"))
+        requests.extend(request_metrics(result))
+        if result["success"]:
+            result["attempts"] = attempts
+            result["metrics"] = metrics
+            result["requests"] = requests
+            return result
+    
+    pieces = split_at_commas(sentence)
+    tokens = []
+    for piece in pieces:
+        piece_result = process_single_sentence(piece, model, client)
+        attempts += 1
+        add_metrics(metrics, piece_result.get("metrics"))
+        requests.extend(request_metrics(piece_result))
+        if piece_result["success"]:
+            tokens.extend(piece_result.get("tokens", []))
+    
+    if tokens:
+        return {"success": True, "tokens": tokens, "raw": "", "degraded": True,
+                "attempts": attempts, "metrics": metrics, "requests": requests}
+    result["attempts"] = attempts
+    result["metrics"] = metrics
+    result["requests"] = requests
+    return result
+
+
+def estimate_prompt_tokens(text: str) -> int:
+    """Kaba token tahmini (Türkçe metinde ~3 karakter/token)"""
+    return len(text) // 3 + 1
+
+
+def estimate_output_tokens(text: str) -> int:
+    """JSON token listesi için kaba çıktı tahmini"""
+    return CONFIG.output_tokens_per_word * len(text.split()) + 10
+
+
+class OptionPlanner:
+    """
+    İstek başına num_ctx / num_predict planlayıcı (--plan-options).
+    Değerler küçük kova kümelerinden (CONFIG.ctx_buckets / predict_buckets) seçilir
+    ki sunucu KV ayırmalarını yeniden kullanabilsin. num_predict istekten isteğe
+    serbestçe değişir; num_ctx değişikliği Ollama'da modeli yeniden yüklettiği için
+    yapışkandır: büyük kovaya hemen geçilir, küçüğe ancak CONFIG.ctx_hold ardışık
+    istek sığdıktan sonra inilir.
+    Kova kullanımı ve num_predict sınırında kesilen (done_reason=length) yanıtlar
+    planlama kapalıyken de sayılır. Thread-safe.
+    """
+    
+    def __init__(self):
+        self.ctx = None  # Şu anki num_ctx kovası
+        self._smaller = 0  # Daha küçük kovaya sığan ardışık istek
+        self._smaller_max = 0  # Bu isteklerin en büyük ihtiyacı
+        self.ctx_switches = 0
+        self.usage = {}  # (num_ctx, num_predict) -> istek sayısı
+        self.truncated = {}  # (num_ctx, num_predict) -> kesilen yanıt
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _bucket(buckets, need: int) -> int:
+        return next((b for b in sorted(buckets) if b >= need), max(buckets))
+    
+    def _plan_ctx(self, need: int) -> int:
+        with self._lock:
+            if self.ctx is None or need > self.ctx:
+                self.ctx_switches += self.ctx is not None
+                self.ctx = need
+                self._smaller = self._smaller_max = 0
+            elif need < self.ctx:
+                self._smaller += 1
+                self._smaller_max = max(self._smaller_max, need)
+                if self._smaller >= CONFIG.ctx_hold:
+                    self.ctx_switches += 1
+                    self.ctx = self._smaller_max
+                    self._smaller = self._smaller_max = 0
+            else:
+                self._smaller = self._smaller_max = 0
+            return self.ctx
+    
+    def plan(self, prompt_tokens: int, output_tokens: int) -> dict:
+        """Tahmini istem / çıktı token'larından Ollama seçenekleri"""
+        num_predict = self._bucket(CONFIG.predict_buckets, output_tokens)
+        used = CONFIG.system_prompt_tokens + prompt_tokens
+        num_ctx = self._plan_ctx(self._bucket(CONFIG.ctx_buckets, used + num_predict))
+        # En büyük bağlama da sığmıyorsa çıktı payından kıs
+        if used + num_predict > num_ctx:
+            num_predict = max(min(CONFIG.predict_buckets), num_ctx - used)
+        return {"temperature": CONFIG.temperature, "num_ctx": num_ctx, "num_predict": num_predict}
+    
+    def escalate(self, prompt: str, options: dict) -> dict:
+        """Kesilen yanıt için bir üst num_predict kovası; yoksa ya da seçenekler büyümüyorsa None"""
+        if not CONFIG.plan_options:
+            return None
+        bigger = [b for b in CONFIG.predict_buckets if b > options["num_predict"]]
+        if not bigger:
+            return None
+        planned = self.plan(estimate_prompt_tokens(prompt), min(bigger))
+        # Bağlam sınırında plan() num_predict'i geri kısabilir; hiçbir değer
+        # büyümüyorsa aynı isteği tekrarlamak yine kesilir
+        if planned["num_predict"] <= options["num_predict"] and \
+                planned["num_ctx"] <= options.get("num_ctx", 0):
+            return None
+        return planned
+    
+    def record(self, options: dict, response) -> bool:
+        """İsteği say; yanıt num_predict sınırında kesildiyse True"""
+        key = (options.get("num_ctx", 0), options["num_predict"])
+        truncated = getattr(response, "done_reason", None) == "length"
+        with self._lock:
+            self.usage[key] = self.usage.get(key, 0) + 1
+            if truncated:
+                self.truncated[key] = self.truncated.get(key, 0) + 1
+        return truncated
+    
+    def summary(self) -> list[str]:
+        lines = []
+        for (num_ctx, num_predict), n in sorted(self.usage.items()):
+            cut = self.truncated.get((num_ctx, num_predict), 0)
+            lines.append(f"num_ctx={num_ctx or 'model'} num_predict={num_predict}: "
+                         f"{n} istek, {cut} kesilen ({cut / n:.1%})")
+        total = sum(self.usage.values())
+        cut = sum(self.truncated.values())
+        if total:
+            lines.append(f"toplam: {total} istek, {cut} kesilen ({cut / total:.1%}), "
+                         f"{self.ctx_switches} num_ctx değişimi")
+        return lines
+
+
+OPTION_PLANNER = OptionPlanner()
+
+
+def request_options(prompt: str, output_tokens: int, num_predict: int) -> dict:
+    """
+    İstek seçenekleri. --plan-options açıksa num_ctx / num_predict tahmini
+    token sayılarından kovalarla seçilir, değilse sabit num_predict kullanılır.
+    """
+    if CONFIG.plan_options:
+        return OPTION_PLANNER.plan(estimate_prompt_tokens(prompt), output_tokens)
+    return {"temperature": CONFIG.temperature, "num_predict": num_predict}
+
+
+def get_model_num_ctx(model: str, default: int = 4096, client=ollama) -> int:
+    """Modelfile'daki PARAMETER num_ctx değerini ollama.show ile oku"""
+    try:
+        params = client.show(model).parameters or ""
+    except Exception:
+        return default
+    m = re.search(r'^\s*num_ctx\s+(\d+)', params, re.MULTILINE)
+    return int(m.group(1)) if m else default
+
+
+def plan_batches(sentences: list[dict], num_ctx: int, batch_size: int,
+                 window: int = None) -> list[list[dict]]:
+    """
+    Cümleleri çok cümleli isteklere paketle.
+    Ardışık `window` cümle uzunluğa göre sıralanır ve num_ctx bütçesine
+    sığacak şekilde en fazla `batch_size` cümlelik paketlere bölünür.
+    Benzer uzunluktaki cümleler aynı pakette toplandığı için bütçe israfı azalır.
+    """
+    window = window or CONFIG.batch_window
+    budget = num_ctx - CONFIG.system_prompt_tokens
+    batches = []
+    
+    for w_start in range(0, len(sentences), window):
+        chunk = sorted(sentences[w_start:w_start + window], key=lambda s: len(s["cumle"]))
+        current, used = [], 0
+        for sent_data in chunk:
+            cost = estimate_prompt_tokens(sent_data["cumle"]) + estimate_output_tokens(sent_data["cumle"])
+            if current and (len(current) >= batch_size or used + cost > budget):
+                batches.append(current)
+                current, used = [], 0
+            current.append(sent_data)
+            used += cost
+        if current:
+            batches.append(current)
+    
+    return batches
+
+
+BATCH_INSTRUCTION = (
+    "Aşağıda köşeli parantez içinde numaralandırılmış birden fazla cümle var. "
+    "Her cümleyi AYRI AYRI, kurallara uygun şekilde işle. Numaraları aynen koru.\n"
+    'Yanıt formatı: {"cumleler": [{"id": <numara>, "tokens": [...]}, ...]}\n\n'
+)
+
+
+def process_sentence_batch(batch: list[dict], model: str, client=ollama) -> dict:
+    """
+    Birden fazla cümleyi tek istekte işle, yanıtı cumle_id'ye göre böl.
+    Returns: {cumle_id: process_single_sentence ile aynı şekilde sonuç}
+    Yanıt çözülemezse veya bir cümle eksikse o cümleler tek tek işlenir.
+    """
+    if len(batch) == 1:
+        s = batch[0]
+        return {s["cumle_id"]: process_single_sentence(s["cumle"], model, client)}
+    
+    prompt = BATCH_INSTRUCTION + "\n".join(f"[{s['cumle_id']}] {s['cumle']}" for s in batch)
+    out_est = sum(estimate_output_tokens(s["cumle"]) for s in batch) * 3 // 2
+    options = request_options(prompt, out_est, max(CONFIG.num_predict, out_est))
     
-    # Word boundary ile kontrol
-    # Türkçe karakterleri de kelime sınırı olarak kabul et
-    pattern = r'(?<![a-zA-ZçÇğĞıİöÖşŞüÜ])' + re.escape(token_lower) + r'(?![a-zA-ZçÇğĞıİöÖşŞüÜ])'
-    return bool(re.search(pattern, sentence_lower))
+    wanted = {s["cumle_id"] for s in batch}
+    results = {}
+    batch_request = None
+    try:
+        response = client.chat(
+            model=model,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            format="json",
+            options=options
+        )
+        OPTION_PLANNER.record(options, response)
+        raw_output = response['message']['content']
+        # Paket sayaçları cümlelere eşit bölünür (cümle başına pay; istek sayacı ayrı)
+        batch_request = response_metrics(response)
+        share = {k: v / len(batch) for k, v in batch_request.items()}
+        data = json.loads(raw_output)
+        for item in data.get("cumleler", []):
+            try:
+                cid = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if cid not in wanted:
+                continue
+            results[cid] = {
+                "success": True,
+                "tokens": item.get("tokens", []),
+                "raw": json.dumps(item, ensure_ascii=False),
+                "metrics": dict(share),
+                "requests": [],
+                "mode": "batch"  # Önbellek anahtarı; tek cümleye düşenler "single" kalır
+            }
+    except Exception:
+        results = {}
+    
+    # Eksik / bozuk kalan cümleler için tek cümle moduna düş
+    for s in batch:
+        if s["cumle_id"] not in results:
+            results[s["cumle_id"]] = process_sentence_with_retry(s["cumle"], model, client)
+    
+    # Toplu isteğin bölünmemiş sayaçları bir kez, ilk cümlenin sonucuyla taşınır
+    if batch_request:
+        first = results[batch[0]["cumle_id"]]
+        first["requests"] = [batch_request] + request_metrics(first)
+    
+    return results
+
+
+TR_LETTERS = frozenset(string.ascii_letters + 'çÇğĞıİöÖşŞüÜ')
+_WORD_RE = re.compile(r'[a-zA-ZçÇğĞıİöÖşŞüÜ]+')
+_PUNCT_ONLY_RE = re.compile(r'^[.,!?;:"\'\-]+$')
+
+
+class SentenceIndex:
+    """
+    Cümlenin Türkçe küçük harfli hali ve kelime kümesi; cümle başına bir kez kurulur.
+    Tek kelimelik token'lar küme üyeliğiyle (O(1)), boşluk/kesme işareti içeren
+    token'lar ise str.find + kelime sınırı kontrolüyle doğrulanır.
+    """
+    __slots__ = ("lower", "words")
+    
+    def __init__(self, sentence: str):
+        self.lower = tr_lower(sentence)
+        self.words = frozenset(_WORD_RE.findall(self.lower))
+    
+    def contains(self, token: str) -> bool:
+        """Token cümlede KELIME olarak var mı? (substring değil)"""
+        return self.contains_lower(tr_lower(token).strip())
+    
+    def contains_lower(self, token_lower: str) -> bool:
+        """contains(), token zaten tr_lower + strip uygulanmışsa"""
+        # Boş token
+        if not token_lower:
+            return False
+        
+        if _WORD_RE.fullmatch(token_lower):
+            return token_lower in self.words
+        
+        # Türkçe harfleri kelime sınırı olarak kabul etmeyen tarama
+        text = self.lower
+        n = len(token_lower)
+        start = text.find(token_lower)
+        while start != -1:
+            end = start + n
+            if ((start == 0 or text[start - 1] not in TR_LETTERS) and
+                    (end == len(text) or text[end] not in TR_LETTERS)):
+                return True
+            start = text.find(token_lower, start + 1)
+        return False
+
+
+def validate_token_in_sentence(token: str, sentence: str) -> bool:
+    """
+    Token cümlede KELIME olarak var mı? (substring değil)
+    Aynı cümlede çok sayıda token için SentenceIndex'i bir kez kurup kullanın.
+    """
+    return SentenceIndex(sentence).contains(token)
 
 
 def filter_and_validate_tokens(tokens: list[dict], sentence: str) -> list[dict]:
     """Token'ları filtrele ve doğrula"""
     validated = []
+    index = SentenceIndex(sentence)
     
     for t in tokens:
         token_text = t.get("token", "").strip()
-        lemma = t.get("lemma", "").lower().rstrip("-")
+        token_lower = tr_lower(token_text)
+        lemma = tr_lower(t.get("lemma", "")).rstrip("-")
         
         # Stop word kontrolü
-        if lemma in CONFIG.stop_words or token_text.lower() in CONFIG.stop_words:
+        if lemma in STOP_WORDS or token_lower in STOP_WORDS:
             continue
         
         # Çok kısa
@@ -202,11 +967,11 @@ def filter_and_validate_tokens(tokens: list[dict], sentence: str) -> list[dict]:
             continue
         
         # Sadece noktalama
-        if re.match(r'^[.,!?;:"\'\-]+$', token_text):
+        if _PUNCT_ONLY_RE.match(token_text):
             continue
         
         # Cümlede gerçekten var mı?
-        if not validate_token_in_sentence(token_text, sentence):
+        if not index.contains_lower(token_lower.strip()):
             continue
         
         validated.append(t)
@@ -214,15 +979,933 @@ def filter_and_validate_tokens(tokens: list[dict], sentence: str) -> list[dict]:
     return validated
 
 
+# ============== BACKENDS ==============
+
+class NoBackendError(RuntimeError):
+    """Hiç sağlıklı sunucu kalmadı; cümle hatası sayılmaz, çalışma durur"""
+
+
+class Backend:
+    """Tek bir Ollama sunucusu ve sayaçları"""
+    
+    def __init__(self, host: str):
+        self.host = host
+        self.client = ollama.Client(host=host)
+        self.in_flight = 0
+        self.latency = None  # Saniye, üstel hareketli ortalama
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0  # Art arda başarısız istek
+        self.healthy = True
+        self.down_reason = ""
+        self.down_since = 0.0
+
+
+class BackendPool:
+    """
+    Birden fazla Ollama sunucusuna yük dengeli dağıtım.
+    ollama modülüyle aynı arayüzü (chat/show/list) sunar, process_single_sentence
+    vb. fonksiyonlara `client` olarak verilebilir. Her istek en az yüklü
+    (uçuştaki istek sayısı, eşitlikte son hatalar ve gecikme) sağlıklı sunucuya gider.
+    Art arda backend_max_failures hata veren sunucu backend_cooldown saniye
+    rotasyondan çıkar; modeli olmayan sunucu kalıcı olarak çıkar.
+    """
+    
+    def __init__(self, hosts: list[str]):
+        self.backends = [Backend(h) for h in hosts]
+        self._lock = threading.Lock()
+    
+    def check_model(self, model: str) -> int:
+        """Her sunucuda modeli ollama.show ile doğrula; sağlıklı sunucu sayısını döndür"""
+        for b in self.backends:
+            try:
+                b.client.show(model)
+                print(f"   ✅ {b.host}")
+            except Exception as e:
+                self._mark_down(b, f"model yok / erişilemiyor: {e}", permanent=True)
+        return sum(1 for b in self.backends if b.healthy)
+    
+    def _mark_down(self, backend: Backend, reason: str, permanent: bool = False):
+        backend.healthy = False
+        backend.down_reason = reason
+        backend.down_since = float("inf") if permanent else time.time()
+        print(f"   ⚠️  Backend rotasyondan çıktı: {backend.host} ({reason})")
+    
+    def acquire(self) -> Backend:
+        with self._lock:
+            now = time.time()
+            for b in self.backends:
+                # Soğuma süresi dolan sunucu yeniden denenir; ilk hatada tekrar çıkar
+                if not b.healthy and now - b.down_since > CONFIG.backend_cooldown:
+                    b.healthy = True
+                    b.failures = CONFIG.backend_max_failures - 1
+            candidates = [b for b in self.backends if b.healthy]
+            if not candidates:
+                raise NoBackendError("Sağlıklı Ollama backend'i kalmadı")
+            backend = min(candidates, key=lambda b: (b.in_flight, b.failures, b.latency or 0.0))
+            backend.in_flight += 1
+            return backend
+    
+    def release(self, backend: Backend, seconds: float, ok: bool):
+        with self._lock:
+            backend.in_flight -= 1
+            backend.requests += 1
+            if ok:
+                backend.failures = 0
+                backend.latency = seconds if backend.latency is None else \
+                    0.8 * backend.latency + 0.2 * seconds
+            else:
+                backend.errors += 1
+                backend.failures += 1
+                if backend.healthy and backend.failures >= CONFIG.backend_max_failures:
+                    self._mark_down(backend, f"{backend.failures} art arda hata")
+    
+    def chat(self, *args, **kwargs):
+        backend = self.acquire()
+        start = time.time()
+        try:
+            response = backend.client.chat(*args, **kwargs)
+        except Exception:
+            self.release(backend, time.time() - start, ok=False)
+            raise
+        if kwargs.get("stream"):
+            return self._stream(backend, response, start)
+        self.release(backend, time.time() - start, ok=True)
+        return response
+    
+    def _stream(self, backend: Backend, response, start: float):
+        """Akan yanıt bitene (veya kapatılana) kadar sunucuyu meşgul say"""
+        failed = False
+        try:
+            yield from response
+        except Exception:
+            failed = True
+            raise
+        finally:
+            close = getattr(response, "close", None)
+            if close:
+                close()
+            self.release(backend, time.time() - start, ok=not failed)
+    
+    def _first_healthy(self) -> Backend:
+        for b in self.backends:
+            if b.healthy:
+                return b
+        raise NoBackendError("Sağlıklı Ollama backend'i kalmadı")
+    
+    def show(self, model: str):
+        return self._first_healthy().client.show(model)
+    
+    def summary(self) -> list[str]:
+        lines = []
+        for b in self.backends:
+            latency = f"{b.latency:.2f}s" if b.latency is not None else "-"
+            state = "✅" if b.healthy else f"❌ {b.down_reason}"
+            lines.append(f"{b.host}: {b.requests} istek, {b.errors} hata, "
+                         f"gecikme {latency} {state}")
+        return lines
+    
+    def list(self):
+        return self._first_healthy().client.list()
+
+
+class FakeBackend:
+    """
+    Sahte Ollama istemcisi: gerçek model olmadan uçtan uca test ve benchmark için.
+    BackendPool gibi ollama arayüzünü (chat/show/list) sunar, `client` olarak verilir.
+    Yanıt cümledeki kelimelerden deterministik üretilir (token = kelime,
+    lemma = küçük harf gövde), tek cümle, çok cümleli paket ve akan yanıt desteklenir.
+    latency: istek başına bekleme (saniye); failure_rate: isteklerin bu oranı
+    yarısı bağlantı hatası, yarısı bozuk JSON olarak başarısız olur (seed ile tekrarlanabilir).
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: int = 0,
+                 num_ctx: int = 4096):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.num_ctx = num_ctx
+        self.requests = 0
+        self.errors = 0
+        self.loaded_ctx = None  # num_ctx değişince model "yeniden yüklenir"
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fake_tokens(text: str) -> list[dict]:
+        tokens = []
+        for word in _WORD_RE.findall(text):
+            if len(word) < 2:
+                continue
+            lemma = tr_lower(word)
+            tokens.append({"token": word, "lemma": lemma[:max(3, len(lemma) - 2)],
+                           "anlam": "", "etiket": ""})
+        return tokens
+
+    def _reply(self, prompt: str) -> str:
+        items = re.findall(r'^\[(\d+)\] (.*)$', prompt, re.MULTILINE)
+        if items:
+            return json.dumps({"cumleler": [{"id": int(cid), "tokens": self.fake_tokens(text)}
+                                            for cid, text in items]}, ensure_ascii=False)
+        return json.dumps({"tokens": self.fake_tokens(prompt)}, ensure_ascii=False)
+
+    def chat(self, model: str, messages: list[dict], stream: bool = False,
+             options: dict = None, **kwargs):
+        prompt = messages[-1]["content"]
+        options = options or {}
+        num_ctx = options.get("num_ctx", self.num_ctx)
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            if roll < self.failure_rate:
+                self.errors += 1
+            reloaded = num_ctx != self.loaded_ctx
+            self.loaded_ctx = num_ctx
+        if self.latency:
+            time.sleep(self.latency)
+        if roll < self.failure_rate / 2:
+            raise ConnectionError("sahte backend: bağlantı hatası")
+
+        content = self._reply(prompt)
+        if roll < self.failure_rate:
+            content = content[:len(content) // 2]  # Yarım kalmış JSON
+        done_reason = "stop"
+        num_predict = options.get("num_predict")
+        if num_predict and estimate_prompt_tokens(content) > num_predict:
+            content = content[:num_predict * 3]
+            done_reason = "length"
+
+        counters = dict(
+            done_reason=done_reason,
+            prompt_eval_count=CONFIG.system_prompt_tokens + estimate_prompt_tokens(prompt),
+            prompt_eval_duration=int(self.latency * 0.2e9),
+            eval_count=estimate_prompt_tokens(content),
+            eval_duration=int(self.latency * 0.8e9),
+            load_duration=int(CONFIG.reload_threshold * 2e9) if reloaded else 0,
+        )
+        if not stream:
+            return ollama.ChatResponse(model=model, done=True, **counters,
+                                       message=ollama.Message(role="assistant", content=content))
+        return self._stream(model, content, counters)
+
+    @staticmethod
+    def _stream(model: str, content: str, counters: dict):
+        pieces = re.findall(r'.{1,16}', content, re.DOTALL)
+        for i, piece in enumerate(pieces):
+            last = i == len(pieces) - 1
+            yield ollama.ChatResponse(model=model, done=last, **(counters if last else {}),
+                                      message=ollama.Message(role="assistant", content=piece))
+
+    def show(self, model: str):
+        return SimpleNamespace(parameters=f"num_ctx {self.num_ctx}")
+
+    def summary(self) -> list[str]:
+        return [f"sahte backend: {self.requests} istek, {self.errors} hata "
+                f"(gecikme {self.latency:.2f}s, hata oranı {self.failure_rate:.0%})"]
+
+    def list(self):
+        return SimpleNamespace(models=[])
+
+
+# ============== RESPONSE CACHE ==============
+
+def normalize_sentence(sentence: str) -> str:
+    """Önbellek anahtarı için cümleyi normalleştir (NFC + boşluk sadeleştirme)"""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', sentence)).strip()
+
+
+def get_model_digest(model: str, client=ollama) -> str:
+    """Yerel modelin digest'i; Modelfile yeniden oluşturulunca değişir"""
+    try:
+        for m in client.list().models:
+            if m.model in (model, f"{model}:latest"):
+                return m.digest or ""
+    except Exception:
+        pass
+    return ""
+
+
+class ResponseCache:
+    """
+    process_single_sentence sonuçları için kalıcı, içerik adresli önbellek.
+    Anahtar: sha256(normalleştirilmiş cümle, model, model digest, seçenekler, istek
+    modu). Mod "single" (tek cümlelik istem) veya "batch" (toplu istem); toplu
+    istemden gelen yanıt tek cümle yanıtı yerine geçmez. Yalnızca tam başarılı
+    yanıtlar saklanır: virgülden bölünmüş (degraded) ve yarıda kesilmiş (aborted)
+    sonuçlar bir sonraki çalışmada yeniden istenir. Toplam boyut max_bytes'ı aşınca
+    en uzun süre kullanılmayan kayıtlar silinir. Thread-safe.
+    """
+    
+    def __init__(self, path: str, model: str, digest: str, options: dict,
+                 max_bytes: int = None):
+        self.path = path
+        self.max_bytes = max_bytes or CONFIG.cache_max_mb * 1024 * 1024
+        self._prefix = json.dumps([model, digest, options], sort_keys=True, ensure_ascii=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS cache (
+            key TEXT PRIMARY KEY, value TEXT NOT NULL,
+            size INTEGER NOT NULL, last_used REAL NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS cache_last_used ON cache(last_used)")
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+    
+    def key(self, sentence: str, mode: str = "single") -> str:
+        return hashlib.sha256(f"{self._prefix}\n{mode}\n{normalize_sentence(sentence)}"
+                              .encode('utf-8')).hexdigest()
+    
+    def get(self, sentence: str, mode: str = "single") -> dict:
+        """Önbellekteki sonucu döndür, yoksa None"""
+        k = self.key(sentence, mode)
+        with self._lock:
+            row = self._db.execute("SELECT value FROM cache WHERE key = ?", (k,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE cache SET last_used = ? WHERE key = ?", (time.time(), k))
+        return json.loads(row[0])
+    
+    def put(self, sentence: str, result: dict, mode: str = "single"):
+        if not result.get("success") or result.get("degraded") or result.get("aborted"):
+            return
+        # Sayaçlar bu isteğe ait; önbellekten okunan yanıt için raporlanmamalı
+        value = json.dumps({k: v for k, v in result.items() if k not in ("metrics", "requests", "attempts", "mode")},
+                           ensure_ascii=False)
+        size = len(value.encode('utf-8'))
+        k = self.key(sentence, mode)
+        with self._lock:
+            old = self._db.execute("SELECT size FROM cache WHERE key = ?", (k,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                             (k, value, size, time.time()))
+            self._size += size - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+    
+    def _evict(self):
+        """Boyut %90'ın altına inene kadar en eski kullanılan kayıtları sil"""
+        target = self.max_bytes * 0.9
+        while self._size > target:
+            rows = self._db.execute(
+                "SELECT key, size FROM cache ORDER BY last_used LIMIT 256").fetchall()
+            if not rows:
+                break
+            self._db.executemany("DELETE FROM cache WHERE key = ?", [(k,) for k, _ in rows])
+            self._size -= sum(sz for _, sz in rows)
+    
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return (f"{self.hits} isabet, {self.misses} ıska ({rate:.1f}%), "
+                f"{self._size / 1024 / 1024:.1f} MB")
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ============== TELEMETRY ==============
+
+class LLMTelemetry:
+    """
+    Ollama sayaçlarını (prompt_eval_*, eval_*, load_duration) cümle başına
+    <output>.metrics.csv dosyasına ekler (toplu istekte cümlenin payı). Toplamlar,
+    son `window` istek üzerinden kayan prompt / üretim token/s hızları ve model
+    yeniden yükleme sayısı ise HTTP isteği başına, bölünmemiş sayaçlarla tutulur.
+    Her checkpoint'te <output>.metrics.prom (Prometheus metin formatı) güncellenir.
+    """
+    CSV_HEADER = ("zaman", "cumle_id", "pdf_sayfa", "sure_s") + METRIC_FIELDS
+    
+    def __init__(self, output_prefix: str, window: int = None):
+        self.csv_file = f"{output_prefix}.metrics.csv"
+        self.prom_file = f"{output_prefix}.metrics.prom"
+        self.window = deque(maxlen=window or CONFIG.telemetry_window)
+        self.totals = dict.fromkeys(METRIC_FIELDS, 0)
+        self.requests = 0
+        self.cache_hits = 0
+        self.reloads = 0
+        new_file = not os.path.exists(self.csv_file)
+        self._csv = open(self.csv_file, 'a', encoding='utf-8')
+        if new_file:
+            self._csv.write(",".join(self.CSV_HEADER) + "\n")
+    
+    def record(self, sent_data: dict, llm_result: dict, sent_time: float):
+        if llm_result.get("cached"):
+            self.cache_hits += 1
+            return
+        for request in request_metrics(llm_result):
+            self.requests += 1
+            add_metrics(self.totals, request)
+            self.window.append(request)
+            if request.get("load_duration", 0) / 1e9 >= CONFIG.reload_threshold:
+                self.reloads += 1
+        metrics = llm_result.get("metrics")
+        if not metrics:
+            return  # Erken kesilen akış / bağlantı hatası: sayaç yok
+        row = [time.strftime("%Y-%m-%dT%H:%M:%S"), sent_data["cumle_id"], sent_data["pdf_sayfa"],
+               f"{sent_time:.3f}"] + [round(metrics.get(k, 0)) for k in METRIC_FIELDS]
+        self._csv.write(",".join(map(str, row)) + "\n")
+    
+    def rates(self) -> tuple[float, float]:
+        """Kayan pencerede (prompt token/s, üretim token/s)"""
+        def rate(count_key, dur_key):
+            count = sum(m.get(count_key, 0) for m in self.window)
+            dur = sum(m.get(dur_key, 0) for m in self.window) / 1e9
+            return count / dur if dur else 0.0
+        return rate("prompt_eval_count", "prompt_eval_duration"), rate("eval_count", "eval_duration")
+    
+    def summary(self) -> str:
+        prompt_rate, gen_rate = self.rates()
+        return (f"prompt {prompt_rate:.0f} tok/s | üretim {gen_rate:.1f} tok/s | "
+                f"model yükleme {self.reloads}")
+    
+    def flush(self):
+        """CSV'yi diske it, Prometheus dosyasını yeniden yaz"""
+        self._csv.flush()
+        prompt_rate, gen_rate = self.rates()
+        t = self.totals
+        lines = [
+            "# TYPE lemma_llm_requests_total counter",
+            f"lemma_llm_requests_total {self.requests}",
+            "# TYPE lemma_llm_cache_hits_total counter",
+            f"lemma_llm_cache_hits_total {self.cache_hits}",
+            "# TYPE lemma_llm_model_reloads_total counter",
+            f"lemma_llm_model_reloads_total {self.reloads}",
+            "# TYPE lemma_llm_prompt_tokens_total counter",
+            f"lemma_llm_prompt_tokens_total {t['prompt_eval_count']:.0f}",
+            "# TYPE lemma_llm_generated_tokens_total counter",
+            f"lemma_llm_generated_tokens_total {t['eval_count']:.0f}",
+            "# TYPE lemma_llm_prompt_seconds_total counter",
+            f"lemma_llm_prompt_seconds_total {t['prompt_eval_duration'] / 1e9:.3f}",
+            "# TYPE lemma_llm_generation_seconds_total counter",
+            f"lemma_llm_generation_seconds_total {t['eval_duration'] / 1e9:.3f}",
+            "# TYPE lemma_llm_load_seconds_total counter",
+            f"lemma_llm_load_seconds_total {t['load_duration'] / 1e9:.3f}",
+            "# TYPE lemma_llm_prompt_tokens_per_second gauge",
+            f"lemma_llm_prompt_tokens_per_second {prompt_rate:.3f}",
+            "# TYPE lemma_llm_generated_tokens_per_second gauge",
+            f"lemma_llm_generated_tokens_per_second {gen_rate:.3f}",
+        ]
+        tmp = self.prom_file + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.prom_file)
+    
+    def close(self):
+        self.flush()
+        self._csv.close()
+
+
+# ============== CHECKPOINT JOURNAL ==============
+
+class JournalWriter:
+    """
+    Append-only JSONL checkpoint günlüğü.
+    Satırlar arka plandaki bir thread tarafından yazılır; LLM döngüsü diske beklemez.
+    
+    Satır tipleri:
+        {"r": [...]}      -> tek cümle kaydı, encode_record ile sıkıştırılmış
+        {"data": {...}}   -> tek cümle kaydı, eski biçim (export_json'daki "data" elemanı)
+        {"stats": {...}}  -> o ana kadarki istatistik (son satır geçerli)
+    
+    write_time: yazıcı thread'inin write + fsync'te geçirdiği toplam süre (saniye).
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._queue = queue.Queue()
+        self._error = None
+        self.write_time = 0.0
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            while True:
+                lines = self._queue.get()
+                try:
+                    if lines is None:
+                        return
+                    start = time.perf_counter()
+                    f.write("".join(lines))
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self.write_time += time.perf_counter() - start
+                except Exception as e:
+                    self._error = e
+                finally:
+                    self._queue.task_done()
+    
+    def append(self, objs: list[dict]):
+        """Kayıtları yazma kuyruğuna ekle (bloklamaz)"""
+        if self._error:
+            raise self._error
+        lines = [json.dumps(o, ensure_ascii=False) + "\n" for o in objs]
+        if lines:
+            self._queue.put(lines)
+    
+    def flush(self):
+        """Kuyruktaki tüm satırlar diske yazılana kadar bekle"""
+        self._queue.join()
+        if self._error:
+            raise self._error
+    
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+
+
+TOKEN_FIELDS = ("token", "lemma", "anlam", "etiket")
+
+
+def encode_record(record: dict) -> list:
+    """
+    Kaydı anahtarsız satıra çevir: [cumle_id, pdf_sayfa, cumle, token'lar].
+    Alanları tam olarak TOKEN_FIELDS olan token [token, lemma, anlam, etiket]
+    listesi olur; modelin ek / eksik alanlı token'ları sözlük olarak kalır.
+    """
+    tokens = [[t[k] for k in TOKEN_FIELDS] if tuple(t) == TOKEN_FIELDS else t
+              for t in record["tokens"]]
+    return [record["cumle_id"], record["pdf_sayfa"], record["cumle"], tokens]
+
+
+def decode_record(row: list) -> dict:
+    """encode_record'un tersi; build_record ile aynı alan sırası"""
+    cumle_id, pdf_sayfa, cumle, tokens = row
+    return {
+        "pdf_sayfa": pdf_sayfa,
+        "cumle_id": cumle_id,
+        "cumle": cumle,
+        "tokens": [dict(zip(TOKEN_FIELDS, t)) if isinstance(t, list) else t for t in tokens]
+    }
+
+
+def journal_record(obj: dict) -> dict:
+    """Günlük satırındaki cümle kaydı (yeni veya eski biçim); yoksa None"""
+    if "r" in obj:
+        return decode_record(obj["r"])
+    return obj.get("data")
+
+
+def iter_journal(path: str):
+    """
+    Günlüğü satır satır oku, her geçerli satırın nesnesini üret.
+    Yalnızca yarım yazılmış son satır (kesinti) atılır ve dosya o noktadan kırpılır,
+    böylece sonraki eklemeler bozuk satırın arkasına yazılmaz. Ortadaki bozuk bir
+    satır uyarıyla atlanır; arkasındaki geçerli kayıtlar okunmaya devam eder ve
+    dosyaya dokunulmaz.
+    """
+    offset = 0
+    torn = None  # son okunan satır bozuksa: (ofset, satır no)
+    with open(path, 'rb') as f:
+        for lineno, raw in enumerate(f, 1):
+            if torn is not None:
+                print(f"⚠️  Günlükte bozuk satır atlandı: {path}:{torn[1]}")
+                torn = None
+            try:
+                obj = json.loads(raw) if raw.endswith(b"\n") else None
+            except ValueError:
+                obj = None
+            if obj is None:
+                torn = (offset, lineno)
+            else:
+                yield obj
+            offset += len(raw)
+    
+    if torn is not None:
+        print(f"⚠️  Günlük sonunda yarım satır atıldı: {path}")
+        with open(path, 'r+b') as f:
+            f.truncate(torn[0])
+
+
+def read_journal(path: str) -> tuple[list[dict], dict]:
+    """Günlüğün tamamını oku -> (kayıtlar, son istatistik); aynı cümlenin ilk kaydı geçerli"""
+    records = {}
+    stats = None
+    for obj in iter_journal(path):
+        record = journal_record(obj)
+        if record is not None:
+            records.setdefault(record["cumle_id"], record)
+        elif "stats" in obj:
+            stats = obj["stats"]
+    return list(records.values()), stats
+
+
+def iter_journal_records(path: str):
+    """Günlükteki cümle kayıtlarını bellekte tutmadan üret (read_journal gibi ilk kayıt geçerli)"""
+    seen = set()
+    for obj in iter_journal(path):
+        record = journal_record(obj)
+        if record is not None and record["cumle_id"] not in seen:
+            seen.add(record["cumle_id"])
+            yield record
+
+
+# ============== RESULT STORE ==============
+#
+# Nihai çıktı biçimleri (--output-format):
+#   legacy   : <output>.json (indent=2) + <output>.tsv; cümle metni her token satırında tekrarlanır
+#   sqlite   : <output>.sqlite — normalleştirilmiş cumle / token tabloları
+#   columnar : <output>.szc — sütun tabanlı ikili dosya, token alanları sözlük kodlu
+# sonuc_donustur.py herhangi bir biçimden diğerlerine (ve eski JSON/TSV'ye) çevirir.
+
+OUTPUT_EXTENSIONS = {"legacy": (".json", ".tsv"), "sqlite": (".sqlite",), "columnar": (".szc",)}
+
+
+def write_legacy_json(path: str, meta: dict, records):
+    """
+    Eski JSON çıktısı: {"meta": ..., "data": [...]}.
+    Kayıtlar akış halinde yazılır; çıktı json.dump(..., indent=2) ile aynıdır.
+    """
+    meta = json.dumps(meta, ensure_ascii=False, indent=2)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{\n  "meta": ' + meta.replace("\n", "\n  ") + ',\n  "data": [')
+        first = True
+        for record in records:
+            body = json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+            f.write(("\n    " if first else ",\n    ") + body)
+            first = False
+        f.write("]\n}" if first else "\n  ]\n}")
+
+
+def write_legacy_tsv(path: str, records):
+    """Eski TSV çıktısı: token başına bir satır, cümlenin ilk 100 karakteri ile"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("pdf_sayfa\tcumle_id\ttoken\tlemma\tanlam\tetiket\tcumle\n")
+        
+        for record in records:
+            for token in record["tokens"]:
+                cumle_clean = record["cumle"].replace("\t", " ").replace("\n", " ")[:100]
+                f.write(f"{record['pdf_sayfa']}\t"
+                       f"{record['cumle_id']}\t"
+                       f"{token.get('token', '')}\t"
+                       f"{token.get('lemma', '')}\t"
+                       f"{token.get('anlam', '')}\t"
+                       f"{token.get('etiket', '')}\t"
+                       f"{cumle_clean}\n")
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE meta (anahtar TEXT PRIMARY KEY, deger TEXT NOT NULL);
+CREATE TABLE cumle (cumle_id INTEGER NOT NULL UNIQUE, pdf_sayfa INTEGER NOT NULL,
+                    cumle TEXT NOT NULL);
+CREATE TABLE token (cumle_id INTEGER NOT NULL REFERENCES cumle (cumle_id),
+                    sira INTEGER NOT NULL, token TEXT, lemma TEXT, anlam TEXT, etiket TEXT,
+                    ekstra TEXT,  -- TOKEN_FIELDS dışında alanı olan token'ın tam JSON'u
+                    PRIMARY KEY (cumle_id, sira)) WITHOUT ROWID;
+"""
+
+
+def write_store_sqlite(path: str, meta: dict, records):
+    """Normalleştirilmiş SQLite deposu; cümle sırası rowid ile korunur"""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executescript(SQLITE_SCHEMA)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                         [(k, json.dumps(v, ensure_ascii=False)) for k, v in meta.items()])
+        for record in records:
+            cid = record["cumle_id"]
+            conn.execute("INSERT INTO cumle VALUES (?, ?, ?)",
+                         (cid, record["pdf_sayfa"], record["cumle"]))
+            conn.executemany(
+                "INSERT INTO token VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(cid, i, *(t.get(k) for k in TOKEN_FIELDS),
+                  None if tuple(t) == TOKEN_FIELDS else json.dumps(t, ensure_ascii=False))
+                 for i, t in enumerate(record["tokens"])])
+    conn.close()
+
+
+def iter_store_sqlite(path: str):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT c.cumle_id, c.pdf_sayfa, c.cumle, t.token, t.lemma, t.anlam, t.etiket, t.ekstra "
+            "FROM cumle c LEFT JOIN token t ON t.cumle_id = c.cumle_id ORDER BY c.rowid, t.sira")
+        record = None
+        for cid, sayfa, cumle, *fields, ekstra in rows:
+            if record is None or record["cumle_id"] != cid:
+                if record is not None:
+                    yield record
+                record = {"pdf_sayfa": sayfa, "cumle_id": cid, "cumle": cumle, "tokens": []}
+            if ekstra is not None:
+                record["tokens"].append(json.loads(ekstra))
+            elif fields[0] is not None:
+                record["tokens"].append(dict(zip(TOKEN_FIELDS, fields)))
+        if record is not None:
+            yield record
+    finally:
+        conn.close()
+
+
+def read_store_sqlite_meta(path: str) -> dict:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return {k: json.loads(v) for k, v in conn.execute("SELECT anahtar, deger FROM meta")}
+    finally:
+        conn.close()
+
+
+def write_results(path: str, meta: dict, records):
+    """Sonuçları uzantıya göre yaz: .json, .tsv, .sqlite veya .szc"""
+    if path.endswith(".json"):
+        write_legacy_json(path, meta, records)
+    elif path.endswith(".tsv"):
+        write_legacy_tsv(path, records)
+    elif path.endswith(".sqlite"):
+        write_store_sqlite(path, meta, records)
+    elif path.endswith(".szc"):
+        ColumnarStore.write(path, meta, records)
+    else:
+        raise ValueError(f"Bilinmeyen sonuç biçimi: {path}")
+
+
+def open_results(path: str) -> tuple[dict, object]:
+    """
+    Sonuç dosyasını aç -> (meta, kayıt iterable'ı).
+    .json (eski çıktı), .journal.jsonl (checkpoint günlüğü), .sqlite veya .szc okunabilir.
+    """
+    if path.endswith(".journal.jsonl"):
+        records, stats = read_journal(path)
+        return {"stats": stats or {}}, records
+    if path.endswith(".json"):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get("meta", {}), data.get("data", [])
+    if path.endswith(".sqlite"):
+        return read_store_sqlite_meta(path), iter_store_sqlite(path)
+    if path.endswith(".szc"):
+        store = ColumnarStore(path)
+        return store.meta, store
+    raise ValueError(f"Bilinmeyen sonuç biçimi: {path}")
+
+
+class ColumnarStore:
+    """
+    Sütun tabanlı ikili sonuç dosyası (.szc).
+    
+    Dosya düzeni:
+        başlık : b"SZC1" + JSON başlık uzunluğu (uint32) + JSON başlık
+                 {"meta": ..., "cumle": n, "token": m, "sutunlar": {ad: [offset, bayt]}}
+        sütunlar (her biri zlib ile sıkıştırılmış, little-endian):
+            cumle_id, pdf_sayfa   : int32, cümle başına
+            cumle                 : metin sütunu
+            token_cumle           : int32, token başına — ait olduğu cumle_id
+            token, lemma, anlam,
+            etiket, ekstra        : uint32 kod, token başına + "<ad>.sozluk" metin sütunu
+    Metin sütunu: (n + 1) uint32 bayt ofseti (sütun başından, ilki = tablo boyu) + UTF-8 veri. Token'lar cümle sırasıyla
+    ardışıktır. ekstra: TOKEN_FIELDS dışında alanı olan token'ın tam JSON'u ("" = yok).
+    """
+    MAGIC = b"SZC1"
+    HEADER = struct.Struct("<4sI")
+    DICT_COLUMNS = TOKEN_FIELDS + ("ekstra",)
+    
+    @staticmethod
+    def _ints(typecode: str, values) -> bytes:
+        arr = array(typecode, values)
+        if sys.byteorder == "big":
+            arr.byteswap()
+        return zlib.compress(arr.tobytes())
+    
+    @staticmethod
+    def _text(values: list[str]) -> bytes:
+        data = [v.encode('utf-8') for v in values]
+        offsets = array('I', [(len(data) + 1) * 4])
+        for d in data:
+            offsets.append(offsets[-1] + len(d))
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        return zlib.compress(offsets.tobytes() + b"".join(data))
+    
+    @classmethod
+    def write(cls, path: str, meta: dict, records):
+        cols = {"cumle_id": [], "pdf_sayfa": [], "cumle": [], "token_cumle": []}
+        codes = {name: [] for name in cls.DICT_COLUMNS}
+        vocab = {name: {} for name in cls.DICT_COLUMNS}
+        
+        for record in records:
+            cid = record["cumle_id"]
+            cols["cumle_id"].append(cid)
+            cols["pdf_sayfa"].append(record["pdf_sayfa"])
+            cols["cumle"].append(record["cumle"])
+            for t in record["tokens"]:
+                cols["token_cumle"].append(cid)
+                standard = tuple(t) == TOKEN_FIELDS
+                values = [t[k] if standard else "" for k in TOKEN_FIELDS]
+                values.append("" if standard else json.dumps(t, ensure_ascii=False))
+                for name, value in zip(cls.DICT_COLUMNS, values):
+                    codes[name].append(vocab[name].setdefault(str(value), len(vocab[name])))
+        
+        blobs = {
+            "cumle_id": cls._ints('i', cols["cumle_id"]),
+            "pdf_sayfa": cls._ints('i', cols["pdf_sayfa"]),
+            "cumle": cls._text(cols["cumle"]),
+            "token_cumle": cls._ints('i', cols["token_cumle"]),
+        }
+        for name in cls.DICT_COLUMNS:
+            blobs[name] = cls._ints('I', codes[name])
+            blobs[f"{name}.sozluk"] = cls._text(list(vocab[name]))
+        
+        offset, layout = 0, {}
+        for name, blob in blobs.items():
+            layout[name] = [offset, len(blob)]
+            offset += len(blob)
+        header = json.dumps({"meta": meta, "cumle": len(cols["cumle_id"]),
+                             "token": len(cols["token_cumle"]), "sutunlar": layout},
+                            ensure_ascii=False).encode('utf-8')
+        
+        with open(path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, len(header)))
+            f.write(header)
+            for blob in blobs.values():
+                f.write(blob)
+    
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            magic, header_len = self.HEADER.unpack(f.read(self.HEADER.size))
+            if magic != self.MAGIC:
+                raise ValueError(f"Geçersiz sütunlu sonuç dosyası: {path}")
+            self.header = json.loads(f.read(header_len))
+            self._data = f.read()
+        self.meta = self.header["meta"]
+    
+    def _raw(self, name: str) -> bytes:
+        offset, length = self.header["sutunlar"][name]
+        return zlib.decompress(self._data[offset:offset + length])
+    
+    def ints(self, name: str) -> array:
+        arr = array('I' if name in self.DICT_COLUMNS else 'i')
+        arr.frombytes(self._raw(name))
+        if sys.byteorder == "big":
+            arr.byteswap()
+        return arr
+    
+    def texts(self, name: str) -> list[str]:
+        raw = self._raw(name)
+        # İlk ofset, ofset tablosunun bittiği yerdir: tablo boyu buradan okunur
+        (table_len,) = struct.unpack_from("<I", raw)
+        offsets = array('I')
+        offsets.frombytes(raw[:table_len])
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        return [raw[a:b].decode('utf-8') for a, b in zip(offsets, offsets[1:])]
+    
+    def __iter__(self):
+        ids, pages, sentences = self.ints("cumle_id"), self.ints("pdf_sayfa"), self.texts("cumle")
+        token_ref = self.ints("token_cumle")
+        columns = [(self.ints(name), self.texts(f"{name}.sozluk")) for name in self.DICT_COLUMNS]
+        pos = 0
+        for cid, sayfa, cumle in zip(ids, pages, sentences):
+            tokens = []
+            while pos < len(token_ref) and token_ref[pos] == cid:
+                token, lemma, anlam, etiket, ekstra = (vocab[codes[pos]] for codes, vocab in columns)
+                tokens.append(json.loads(ekstra) if ekstra else
+                              dict(zip(TOKEN_FIELDS, (token, lemma, anlam, etiket))))
+                pos += 1
+            yield {"pdf_sayfa": sayfa, "cumle_id": cid, "cumle": cumle, "tokens": tokens}
+
+
+# ============== PIPELINE ==============
+
+_END = object()  # Kuyruk sonu işareti
+
+
+class PipelineStage:
+    """
+    Akış modunda bir aşamanın sayaçları.
+    Kuyrukta bekleme süresi ayrı ölçülür; kalan süre aşamanın gerçek iş süresidir.
+    Doluluk oranı (%) en yüksek olan aşama darboğazdır.
+    """
+    
+    def __init__(self, name: str, out_queue: queue.Queue = None):
+        self.name = name
+        self.out_queue = out_queue
+        self.items = 0
+        self.wait = 0.0
+        self.start = time.time()
+        self.end = None
+    
+    def get(self, q: queue.Queue):
+        t = time.time()
+        item = q.get()
+        self.wait += time.time() - t
+        return item
+    
+    def put(self, item):
+        t = time.time()
+        self.out_queue.put(item)
+        self.wait += time.time() - t
+        if item is _END:
+            self.end = time.time()
+        else:
+            self.items += 1
+    
+    def report(self) -> str:
+        elapsed = max((self.end or time.time()) - self.start, 1e-9)
+        busy = max(0.0, 1 - self.wait / elapsed) * 100
+        line = f"{self.name}: {self.items / elapsed:.2f}/s, doluluk %{busy:.0f}"
+        if self.out_queue is not None:
+            line += f", kuyruk {self.out_queue.qsize()}/{self.out_queue.maxsize}"
+        return line
+
+
+def iter_queue(stage: PipelineStage, q: queue.Queue):
+    """Kuyruğu sonu işaretine kadar oku"""
+    while True:
+        item = stage.get(q)
+        if item is _END:
+            return
+        yield item
+
+
+def build_record(sent_data: dict, result: dict) -> dict:
+    """LLM sonucunu doğrulanmış kayda dönüştür; başarısızsa None"""
+    if not result["success"]:
+        return None
+    return {
+        "pdf_sayfa": sent_data["pdf_sayfa"],
+        "cumle_id": sent_data["cumle_id"],
+        "cumle": sent_data["cumle"],
+        "tokens": filter_and_validate_tokens(result.get("tokens", []), sent_data["cumle"])
+    }
+
+
 # ============== MAIN PROCESSOR ==============
 
 class SozVarligiProcessor:
-    def __init__(self, model: str = CONFIG.model, output_prefix: str = "ince_memed_sozluk"):
+    def __init__(self, model: str = CONFIG.model, output_prefix: str = "ince_memed_sozluk",
+                 concurrency: int = None, batch_size: int = None,
+                 cache: ResponseCache = None, cache_only: bool = False,
+                 client=None):
         self.model = model
+        # ollama modülü (tek sunucu) veya BackendPool (istekler sunucular arasında dağıtılır)
+        self.client = client or ollama
         self.output_prefix = output_prefix
+        self.concurrency = max(1, concurrency or CONFIG.concurrency)
+        self.batch_size = max(1, batch_size or CONFIG.batch_size)
+        self.num_ctx = None  # --batch açıksa ilk kullanımda ollama.show ile okunur
+        self.cache = cache
+        self.cache_only = cache_only
         self.results = []
         self.cumle_counter = 0
         self.processed_count = 0  # Bu session'da işlenen cümle sayısı
+        self.journal_file = f"{output_prefix}.journal.jsonl"
+        self.journal = None
+        self._journaled_count = 0  # self.results'ın günlüğe yazılmış kısmı
+        # Akış modunda (process_stream) kayıtlar günlüğe yazıldıktan sonra bellekten atılır
+        self.keep_results = True
+        self.record_count = 0
+        # Ölü mektup kuyruğu: başarısız / boş sonuç veren cümleler
+        self.dead_letter_file = f"{output_prefix}.dlq.jsonl"
+        self.dead_letters = {}  # cumle_id -> son kayıt
+        self.dead_letter_writer = None
+        self.retry_dead_letters = False  # True ise atlanacak cümleler yine denenir
+        self.output_format = "legacy"  # OUTPUT_EXTENSIONS anahtarlarından biri
+        self.telemetry = None  # İlk işlemde açılır
         self.stats = {
             "toplam_cumle": 0,
             "toplam_token": 0,
@@ -232,136 +1915,502 @@ class SozVarligiProcessor:
         }
     
     def load_checkpoint(self, json_file: str) -> bool:
-        """Varolan checkpoint'i yükle"""
-        if not os.path.exists(json_file):
+        """Varolan checkpoint'i yükle (önce günlük, yoksa JSON / SQLite / .szc çıktısı)"""
+        stores = [f"{self.output_prefix}{ext}" for fmt in ("sqlite", "columnar")
+                  for ext in OUTPUT_EXTENSIONS[fmt]]
+        store = next((p for p in stores if os.path.exists(p)), None)
+        if os.path.exists(self.journal_file):
+            try:
+                self.results, stats = read_journal(self.journal_file)
+                if stats:
+                    self.stats = stats
+                self._journaled_count = len(self.results)
+            except Exception as e:
+                print(f"⚠️  Günlük yükleme hatası: {e}")
+                return False
+        elif os.path.exists(json_file):
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                
+                self.results = data.get("data", [])
+                self.stats = data.get("meta", {}).get("stats", self.stats)
+                # Eski checkpoint günlüğe taşınır, bundan sonra yalnızca eklenir
+                self._journaled_count = 0
+            except Exception as e:
+                print(f"⚠️  Checkpoint yükleme hatası: {e}")
+                return False
+        elif store is not None:
+            try:
+                meta, records = open_results(store)
+                self.results = list(records)
+                self.stats = meta.get("stats", self.stats)
+                self._journaled_count = 0
+            except Exception as e:
+                print(f"⚠️  Checkpoint yükleme hatası: {e}")
+                return False
+        else:
             return False
         
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            self.results = data.get("data", [])
-            self.stats = data.get("meta", {}).get("stats", self.stats)
-            
-            # Cumle counter'ı güncelle
-            if self.results:
-                self.cumle_counter = max(r["cumle_id"] for r in self.results)
-            
-            print(f"📂 Checkpoint yüklendi: {len(self.results)} kayıt, son ID: {self.cumle_counter}")
-            return True
-        except Exception as e:
-            print(f"⚠️  Checkpoint yükleme hatası: {e}")
-            return False
+        self.record_count = len(self.results)
+        
+        # Cumle counter'ı güncelle
+        if self.results:
+            self.cumle_counter = max(r["cumle_id"] for r in self.results)
+        
+        print(f"📂 Checkpoint yüklendi: {len(self.results)} kayıt, son ID: {self.cumle_counter}")
+        return True
     
     def get_processed_sentence_ids(self) -> set:
         """İşlenmiş cümle ID'lerini döndür"""
         return {r["cumle_id"] for r in self.results}
     
-    def save_checkpoint(self):
-        """Mevcut durumu kaydet"""
-        json_file = f"{self.output_prefix}.json"
-        tsv_file = f"{self.output_prefix}.tsv"
-        
-        self.export_json(json_file, silent=True)
-        self.export_tsv(tsv_file, silent=True)
-        print(f"      💾 Checkpoint kaydedildi ({len(self.results)} kayıt)")
+    def load_dead_letters(self):
+        """Ölü mektup kuyruğunu oku (cümle başına son kayıt geçerli)"""
+        if os.path.exists(self.dead_letter_file):
+            for entry in iter_journal(self.dead_letter_file):
+                self.dead_letters[entry["cumle_id"]] = entry
     
-    def process_sentence(self, sent_data: dict) -> dict:
-        """Tek cümle işle"""
-        pdf_sayfa = sent_data["pdf_sayfa"]
-        cumle = sent_data["cumle"]
+    def get_skipped_sentence_ids(self) -> set:
+        """Boş sonuç vermiş veya deneme hakkı bitmiş cümleler"""
+        if self.retry_dead_letters:
+            return set()
+        return {cid for cid, e in self.dead_letters.items()
+                if e["hata_tipi"] == "bos" or e["deneme"] >= CONFIG.dead_letter_max_attempts}
+    
+    def dead_letter(self, sent_data: dict, llm_result: dict, record: dict):
+        """Başarısız veya token'sız kalan cümleyi ölü mektup kuyruğuna yaz"""
+        if record is not None and record["tokens"]:
+            return
+        if record is None and llm_result.get("error_type") == "onbellek":
+            return  # --cache-only ıskası, model hatası değil
+        
         cumle_id = sent_data["cumle_id"]
+        previous = self.dead_letters.get(cumle_id, {}).get("deneme", 0)
+        entry = {
+            "cumle_id": cumle_id,
+            "pdf_sayfa": sent_data["pdf_sayfa"],
+            "cumle": sent_data["cumle"],
+            "hata_tipi": "bos" if record is not None else llm_result.get("error_type", "istek"),
+            "hata": llm_result.get("error", ""),
+            "deneme": previous + llm_result.get("attempts", 1),
+            "zaman": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.dead_letters[cumle_id] = entry
+        if self.dead_letter_writer is None:
+            self.dead_letter_writer = JournalWriter(self.dead_letter_file)
+        self.dead_letter_writer.append([entry])
+    
+    def save_checkpoint(self):
+        """Son checkpoint'ten beri eklenen kayıtları günlüğe ekle"""
+        if self.journal is None:
+            self.journal = JournalWriter(self.journal_file)
         
-        result = process_single_sentence(cumle, self.model)
+        new_records = self.results[self._journaled_count:]
+        self.journal.append([{"r": encode_record(r)} for r in new_records] + [{"stats": self.stats}])
+        if self.keep_results:
+            self._journaled_count = len(self.results)
+        else:
+            self.results = []
+            self._journaled_count = 0
+        print(f"      💾 Checkpoint kaydedildi ({self.record_count} kayıt, +{len(new_records)} yeni)")
+        if self.telemetry is not None:
+            self.telemetry.flush()
+            print(f"      ⚡ {self.telemetry.summary()}")
+    
+    def compact(self):
+        """Günlüğü kapat ve nihai JSON/TSV çıktılarını tek seferde üret"""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        if self.dead_letter_writer is not None:
+            self.dead_letter_writer.close()
+            self.dead_letter_writer = None
+        if self.telemetry is not None:
+            self.telemetry.close()
+            self.telemetry = None
         
-        if result["success"]:
-            tokens = filter_and_validate_tokens(result.get("tokens", []), cumle)
-            
-            # Etiket istatistiği
-            for t in tokens:
-                etiket = t.get("etiket", "") or "STANDART"
-                self.stats["etiket_dagilimi"][etiket] = \
-                    self.stats["etiket_dagilimi"].get(etiket, 0) + 1
-            
-            self.stats["basarili_cumle"] += 1
-            self.stats["toplam_token"] += len(tokens)
-            
-            return {
-                "pdf_sayfa": pdf_sayfa,
-                "cumle_id": cumle_id,
-                "cumle": cumle,
-                "tokens": tokens
-            }
+        if self.keep_results:
+            records = lambda: self.results
+        else:
+            records = lambda: iter_journal_records(self.journal_file)
+        if self.output_format == "legacy":
+            self.export_json(f"{self.output_prefix}.json", silent=True, records=records())
+            self.export_tsv(f"{self.output_prefix}.tsv", silent=True, records=records())
         else:
+            ext, = OUTPUT_EXTENSIONS[self.output_format]
+            write_results(f"{self.output_prefix}{ext}", self.meta(), records())
+    
+    def process_sentence(self, sent_data: dict) -> dict:
+        """Tek cümle işle"""
+        result = process_single_sentence(sent_data["cumle"], self.model, self.client)
+        return self.record_result(sent_data, result)
+    
+    def record_result(self, sent_data: dict, result: dict) -> dict:
+        """LLM sonucunu doğrula ve istatistiklere işle (yalnızca ana thread)"""
+        self.account_abort(result.get("aborted"))
+        return self.account_record(build_record(sent_data, result))
+    
+    def account_abort(self, aborted: str):
+        """Erken kesilen akan yanıtları say"""
+        if aborted:
+            self.stats["erken_durdurulan"] = self.stats.get("erken_durdurulan", 0) + 1
+    
+    def account_record(self, record: dict) -> dict:
+        """Doğrulanmış kaydı istatistiklere işle (yalnızca ana thread)"""
+        if record is None:
             self.stats["hatali_cumle"] += 1
             return None
+        
+        # Etiket istatistiği
+        for t in record["tokens"]:
+            etiket = t.get("etiket", "") or "STANDART"
+            self.stats["etiket_dagilimi"][etiket] = \
+                self.stats["etiket_dagilimi"].get(etiket, 0) + 1
+        
+        self.stats["basarili_cumle"] += 1
+        self.stats["toplam_token"] += len(record["tokens"])
+        return record
+    
+    def _call_llm(self, batch: list[dict]) -> tuple[dict, float]:
+        """Worker thread'inde çalışır: sadece LLM çağrısı, paylaşılan durum değişmez"""
+        sent_start = time.time()
+        results = {}
+        
+        misses = batch
+        mode = "batch" if len(batch) > 1 else "single"
+        if self.cache is not None:
+            misses = []
+            for s in batch:
+                hit = self.cache.get(s["cumle"], mode)
+                if hit is not None:
+                    hit["cached"] = True
+                    results[s["cumle_id"]] = hit
+                else:
+                    misses.append(s)
+        
+        if misses and self.cache_only:
+            for s in misses:
+                results[s["cumle_id"]] = {"success": False, "error_type": "onbellek",
+                                          "error": "önbellekte yok (--cache-only)", "raw": ""}
+        elif misses:
+            if len(misses) == 1:
+                fresh = {misses[0]["cumle_id"]: process_sentence_with_retry(misses[0]["cumle"], self.model, self.client)}
+            else:
+                fresh = process_sentence_batch(misses, self.model, self.client)
+            if self.cache is not None:
+                # Toplu istemden gelenler "batch", tek cümleye düşenler "single" anahtarıyla
+                for s in misses:
+                    result = fresh[s["cumle_id"]]
+                    self.cache.put(s["cumle"], result, result.get("mode", "single"))
+            results.update(fresh)
+        
+        return results, (time.time() - sent_start) / len(batch)
+    
+    def iter_units(self, sentences):
+        """Cümleleri istek birimlerine ayır (batch kapalıysa her cümle bir birim)"""
+        if self.batch_size <= 1:
+            for s in sentences:
+                yield [s]
+            return
+        if self.num_ctx is None:
+            self.num_ctx = max(CONFIG.ctx_buckets) if CONFIG.plan_options else \
+                get_model_num_ctx(self.model, client=self.client)
+        window = []
+        for s in sentences:
+            window.append(s)
+            if len(window) >= CONFIG.batch_window:
+                yield from plan_batches(window, self.num_ctx, self.batch_size)
+                window = []
+        if window:
+            yield from plan_batches(window, self.num_ctx, self.batch_size)
+    
+    def iter_llm_results(self, sentences):
+        """
+        Cümleleri LLM'e gönder, (sent_data, sonuç, süre) üçlülerini GİRDİ SIRASIYLA üret.
+        `sentences` liste veya tembel bir iterable olabilir.
+        concurrency > 1 ise en fazla o kadar istek aynı anda uçuşta olur;
+        erken biten istekler (ve paket içinde sırası karışan cümleler)
+        sıradaki cümle tamamlanana kadar bekletilir.
+        """
+        order = deque()  # Gönderilmiş ama henüz yield edilmemiş cümleler, girdi sırasıyla
+        done = {}  # cumle_id -> (sonuç, süre)
+        
+        def tracked():
+            for s in sentences:
+                order.append(s)
+                yield s
+        
+        units = self.iter_units(tracked())
+        
+        def drain():
+            while order and order[0]["cumle_id"] in done:
+                sent_data = order.popleft()
+                result, sent_time = done.pop(sent_data["cumle_id"])
+                yield sent_data, result, sent_time
+        
+        if self.concurrency <= 1:
+            for unit in units:
+                results, sent_time = self._call_llm(unit)
+                for cid, result in results.items():
+                    done[cid] = (result, sent_time)
+                yield from drain()
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            pending = deque()
+            for unit in units:
+                pending.append(pool.submit(self._call_llm, unit))
+                if len(pending) >= self.concurrency:
+                    break
+            while pending:
+                results, sent_time = pending.popleft().result()
+                # Boşalan yere sıradaki birimi gönder
+                nxt = next(units, None)
+                if nxt is not None:
+                    pending.append(pool.submit(self._call_llm, nxt))
+                for cid, result in results.items():
+                    done[cid] = (result, sent_time)
+                yield from drain()
     
-    def process_sentences(self, sentences: list[dict], verbose: bool = True):
-        """Cümle listesini işle"""
+    def process_sentences(self, sentences, verbose: bool = True):
+        """
+        Cümleleri işle. `sentences` liste veya iter_sentences_from_pdf gibi tembel bir
+        iterable olabilir: tembel girdide ilk istek ilk sayfa çıkarılır çıkarılmaz gider,
+        toplam cümle sayısı ve ETA ise girdi bitene kadar bilinmez.
+        """
         # Checkpoint yükle
         json_file = f"{self.output_prefix}.json"
         checkpoint_loaded = self.load_checkpoint(json_file)
         
         processed_ids = self.get_processed_sentence_ids()
+        self.load_dead_letters()
+        skipped_ids = self.get_skipped_sentence_ids() - processed_ids
         
-        # Henüz işlenmemiş cümleleri filtrele
-        remaining_sentences = [s for s in sentences if s["cumle_id"] not in processed_ids]
+        def wanted(s):
+            return s["cumle_id"] not in processed_ids and s["cumle_id"] not in skipped_ids
         
-        if checkpoint_loaded and not remaining_sentences:
+        if hasattr(sentences, "__len__"):
+            total = len(sentences)
+            remaining_count = sum(1 for s in sentences if wanted(s))
+            already_processed = total - remaining_count
+        else:
+            total = remaining_count = None  # Tembel girdi: sayılar girdi bitince belli olur
+        
+        # Henüz işlenmemiş cümleleri filtrele (girdi tüketildikçe)
+        seen = 0
+        
+        def remaining():
+            nonlocal seen
+            for s in sentences:
+                seen += 1
+                if wanted(s):
+                    yield s
+        
+        remaining_sentences = remaining()
+        first = next(remaining_sentences, None)
+        
+        if checkpoint_loaded and first is None:
             print(f"✅ Tüm cümleler zaten işlenmiş!")
+            # Ara checkpoint'ler toplam_cumle'yi 0 saklar; parça işareti ve birleştirme
+            # cumle_id kaydırması bu değere dayanır
+            self.stats["toplam_cumle"] = seen
+            self.compact()
             self.print_stats()
             return
-        
-        total = len(sentences)
-        remaining_count = len(remaining_sentences)
-        already_processed = total - remaining_count
+        if first is not None:
+            remaining_sentences = chain([first], remaining_sentences)
         
         start_time = time.time()
+        self.telemetry = LLMTelemetry(self.output_prefix)
         
         print(f"\n🚀 İşlem başlıyor...")
         print(f"   Model: {self.model}")
-        print(f"   Toplam cümle: {total}")
-        if checkpoint_loaded:
+        if self.concurrency > 1:
+            print(f"   Eşzamanlı istek: {self.concurrency}")
+        if self.batch_size > 1:
+            print(f"   İstek başına en fazla cümle: {self.batch_size}")
+        if total is not None:
+            print(f"   Toplam cümle: {total}")
+        if checkpoint_loaded and total is not None:
             print(f"   ✅ Zaten işlenmiş: {already_processed}")
             print(f"   🔄 İşlenecek: {remaining_count}")
+        elif checkpoint_loaded:
+            print(f"   ✅ Zaten işlenmiş: {len(processed_ids)} kayıt atlanacak")
+        if skipped_ids:
+            print(f"   ⏭️  Atlanan (ölü mektup, boş/deneme hakkı bitmiş): {len(skipped_ids)}")
         print("=" * 60)
         
-        for i, sent_data in enumerate(remaining_sentences):
-            sent_start = time.time()
+        for sent_data, llm_result, sent_time in self.iter_llm_results(remaining_sentences):
+            result = self.record_result(sent_data, llm_result)
+            self.dead_letter(sent_data, llm_result, result)
+            self.telemetry.record(sent_data, llm_result, sent_time)
             
-            result = self.process_sentence(sent_data)
-            
-            sent_time = time.time() - sent_start
             elapsed = time.time() - start_time
             
             if result and result["tokens"]:
                 self.results.append(result)
+                self.record_count += 1
             
             self.processed_count += 1
             
             if verbose:
                 status = f"✅ {len(result['tokens'])} token" if result else "❌ Hata"
-                eta = (elapsed / self.processed_count) * (remaining_count - self.processed_count)
-                
                 cumle_short = sent_data["cumle"][:50]
-                current_index = already_processed + self.processed_count
-                print(f"[{current_index}/{total}] {status} ({sent_time:.1f}s) | "
+                if total is not None:
+                    eta = (elapsed / self.processed_count) * (remaining_count - self.processed_count)
+                    current_index = already_processed + self.processed_count
+                    position = f"{current_index}/{total}"
+                else:
+                    position = sent_data["cumle_id"]
+                print(f"[{position}] {status} ({sent_time:.1f}s) | "
                       f"S.{sent_data['pdf_sayfa']} | {cumle_short}...")
-                
-                # Her 10 cümlede checkpoint kaydet
-                if self.processed_count % CONFIG.checkpoint_interval == 0:
-                    self.save_checkpoint()
+            
+            # Her checkpoint_interval cümlede checkpoint kaydet. verbose yalnızca ekran
+            # çıktısını denetler: kapalıyken kayıt atlanırsa kesintide tüm ilerleme kaybolur
+            if self.processed_count % CONFIG.checkpoint_interval == 0:
+                self.save_checkpoint()
+                if verbose:
                     print(f"      📊 Toplam: {len(self.results)} kayıt, "
-                          f"{self.stats['toplam_token']} token | ETA: {eta:.0f}s")
+                          f"{self.stats['toplam_token']} token"
+                          + (f" | ETA: {eta:.0f}s" if total is not None else ""))
         
-        # Son checkpoint
+        self.stats["toplam_cumle"] = seen
+        
+        # Son checkpoint + nihai çıktılar
         self.save_checkpoint()
+        self.compact()
+        
+        total_time = time.time() - start_time
+        print("\n" + "=" * 60)
+        print(f"✅ TAMAMLANDI! {total_time:.1f} saniye")
+        if self.cache is not None:
+            print(f"   🗄️  Önbellek: {self.cache.summary()}")
+        if isinstance(self.client, (BackendPool, FakeBackend)):
+            for line in self.client.summary():
+                print(f"   🖥️  {line}")
+        for line in OPTION_PLANNER.summary():
+            print(f"   📐 {line}")
+        self.print_stats()
+    
+    def process_stream(self, sentences, verbose: bool = True):
+        """
+        Akış (pipeline) modu: çıkarım → LLM → doğrulama → kayıt aşamaları ayrı
+        thread'lerde çalışır, aralarında sınırlı kuyruklar vardır. İlk LLM isteği
+        ilk sayfa çıkarılır çıkarılmaz gider; kayıtlar günlüğe yazıldıktan sonra
+        bellekten atılır, bellek kullanımı derlem boyutundan bağımsızdır.
+        `sentences`: iter_sentences_from_pdf gibi tembel bir iterable.
+        """
+        json_file = f"{self.output_prefix}.json"
+        checkpoint_loaded = self.load_checkpoint(json_file)
+        processed_ids = self.get_processed_sentence_ids()
+        self.load_dead_letters()
+        skip_ids = processed_ids | self.get_skipped_sentence_ids()
+        
+        self.keep_results = False
+        if len(self.results) > self._journaled_count:
+            self.save_checkpoint()  # Eski tip JSON checkpoint'i günlüğe taşı
+        self.results = []
+        self._journaled_count = 0
+        
+        size = CONFIG.pipeline_queue_size
+        q_sent, q_llm, q_valid = (queue.Queue(maxsize=size) for _ in range(3))
+        st_extract = PipelineStage("çıkarım", q_sent)
+        st_llm = PipelineStage("LLM", q_llm)
+        st_valid = PipelineStage("doğrulama", q_valid)
+        st_commit = PipelineStage("kayıt")
+        stages = (st_extract, st_llm, st_valid, st_commit)
+        
+        errors = []
+        seen = 0
+        
+        def extract():
+            nonlocal seen
+            for sent_data in sentences:
+                seen += 1
+                if sent_data["cumle_id"] not in skip_ids:
+                    st_extract.put(sent_data)
         
-        self.stats["toplam_cumle"] = total
+        def llm():
+            for item in self.iter_llm_results(iter_queue(st_llm, q_sent)):
+                st_llm.put(item)
+        
+        def validate():
+            for sent_data, llm_result, sent_time in iter_queue(st_valid, q_llm):
+                st_valid.put((sent_data, llm_result, build_record(sent_data, llm_result), sent_time))
+        
+        def start(stage: PipelineStage, fn):
+            def target():
+                try:
+                    fn()
+                except BaseException as e:
+                    errors.append(e)
+                finally:
+                    stage.put(_END)
+            threading.Thread(target=target, name=f"pipeline-{stage.name}", daemon=True).start()
+        
+        start_time = time.time()
+        self.telemetry = LLMTelemetry(self.output_prefix)
+        
+        print(f"\n🚀 İşlem başlıyor (akış modu)...")
+        print(f"   Model: {self.model}")
+        if self.concurrency > 1:
+            print(f"   Eşzamanlı istek: {self.concurrency}")
+        if self.batch_size > 1:
+            print(f"   İstek başına en fazla cümle: {self.batch_size}")
+        if checkpoint_loaded:
+            print(f"   ✅ Zaten işlenmiş: {len(processed_ids)} kayıt atlanacak")
+        if len(skip_ids) > len(processed_ids):
+            print(f"   ⏭️  Atlanan (ölü mektup, boş/deneme hakkı bitmiş): {len(skip_ids) - len(processed_ids)}")
+        print("=" * 60)
+        
+        start(st_extract, extract)
+        start(st_llm, llm)
+        start(st_valid, validate)
+        
+        for sent_data, llm_result, record, sent_time in iter_queue(st_commit, q_valid):
+            self.account_abort(llm_result.get("aborted"))
+            result = self.account_record(record)
+            self.dead_letter(sent_data, llm_result, result)
+            self.telemetry.record(sent_data, llm_result, sent_time)
+            
+            if result and result["tokens"]:
+                self.results.append(result)
+                self.record_count += 1
+            
+            self.processed_count += 1
+            st_commit.items += 1
+            
+            if verbose:
+                status = f"✅ {len(result['tokens'])} token" if result else "❌ Hata"
+                cumle_short = sent_data["cumle"][:50]
+                print(f"[{sent_data['cumle_id']}] {status} ({sent_time:.1f}s) | "
+                      f"S.{sent_data['pdf_sayfa']} | {cumle_short}...")
+            
+            if self.processed_count % CONFIG.checkpoint_interval == 0:
+                self.save_checkpoint()
+                print("      📈 " + " | ".join(st.report() for st in stages))
+        
+        if errors:
+            raise errors[0]
+        
+        self.stats["toplam_cumle"] = seen
+        
+        # Son checkpoint + nihai çıktılar
+        self.save_checkpoint()
+        self.compact()
         
         total_time = time.time() - start_time
         print("\n" + "=" * 60)
         print(f"✅ TAMAMLANDI! {total_time:.1f} saniye")
+        print("   📈 " + "\n   📈 ".join(st.report() for st in stages))
+        if self.cache is not None:
+            print(f"   🗄️  Önbellek: {self.cache.summary()}")
+        if isinstance(self.client, (BackendPool, FakeBackend)):
+            for line in self.client.summary():
+                print(f"   🖥️  {line}")
+        for line in OPTION_PLANNER.summary():
+            print(f"   📐 {line}")
         self.print_stats()
     
     def print_stats(self):
@@ -370,46 +2419,67 @@ class SozVarligiProcessor:
         print(f"   Toplam cümle: {self.stats['toplam_cumle']}")
         print(f"   Başarılı: {self.stats['basarili_cumle']}")
         print(f"   Hatalı: {self.stats['hatali_cumle']}")
+        if self.stats.get("erken_durdurulan"):
+            print(f"   Erken durdurulan: {self.stats['erken_durdurulan']}")
         print(f"   Toplam token: {self.stats['toplam_token']}")
-        print(f"   Toplam kayıt: {len(self.results)}")
+        print(f"   Toplam kayıt: {self.record_count}")
         print(f"\n   Etiket dağılımı:")
         for etiket, count in sorted(self.stats["etiket_dagilimi"].items(), 
                                      key=lambda x: -x[1]):
             print(f"      {etiket or '(boş)'}: {count}")
     
-    def export_json(self, output_file: str, silent: bool = False):
-        """JSON olarak dışa aktar"""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "meta": {
-                    "model": self.model,
-                    "stats": self.stats
-                },
-                "data": self.results
-            }, f, ensure_ascii=False, indent=2)
+    def meta(self) -> dict:
+        return {"model": self.model, "stats": self.stats}
+    
+    def export_json(self, output_file: str, silent: bool = False, records=None):
+        """JSON olarak dışa aktar (akış halinde, json.dump(..., indent=2) ile aynı)"""
+        records = self.results if records is None else records
+        write_legacy_json(output_file, self.meta(), records)
         if not silent:
             print(f"\n📁 JSON: {output_file}")
     
-    def export_tsv(self, output_file: str, silent: bool = False):
+    def export_tsv(self, output_file: str, silent: bool = False, records=None):
         """TSV olarak dışa aktar"""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write("pdf_sayfa\tcumle_id\ttoken\tlemma\tanlam\tetiket\tcumle\n")
-            
-            for record in self.results:
-                for token in record["tokens"]:
-                    cumle_clean = record["cumle"].replace("\t", " ").replace("\n", " ")[:100]
-                    f.write(f"{record['pdf_sayfa']}\t"
-                           f"{record['cumle_id']}\t"
-                           f"{token.get('token', '')}\t"
-                           f"{token.get('lemma', '')}\t"
-                           f"{token.get('anlam', '')}\t"
-                           f"{token.get('etiket', '')}\t"
-                           f"{cumle_clean}\n")
-        
+        records = self.results if records is None else records
+        write_legacy_tsv(output_file, records)
         if not silent:
             print(f"📁 TSV: {output_file}")
 
 
+# ============== SHARDS ==============
+#
+# Büyük çalışmalar sayfa aralıklarına (parça) bölünüp ayrı process / makinelerde
+# çalıştırılabilir (--pages İLK-SON). Her parçanın cumle_id'leri 1'den başlar;
+# parca_yonetici.py parçaları manifest sırasıyla birleştirirken her parçaya
+# önceki parçaların toplam cümle sayısını ekler, böylece numaralar tek parça
+# çalıştırmayla aynı olur.
+
+def parse_page_range(value: str) -> tuple[int, int]:
+    """'51-100' -> (51, 100); PDF sayfa numaraları 1 tabanlı, iki uç dahil"""
+    m = re.fullmatch(r'\s*(\d+)\s*-\s*(\d+)\s*', value)
+    if not m or not 1 <= int(m.group(1)) <= int(m.group(2)):
+        raise argparse.ArgumentTypeError(f"Geçersiz sayfa aralığı: {value!r} (ör. 51-100)")
+    return int(m.group(1)), int(m.group(2))
+
+
+def write_shard_marker(output_prefix: str, pdf_path: str, pages: tuple[int, int],
+                       processor: "SozVarligiProcessor"):
+    """Parça bitti işareti: birleştirme cumle_id kaydırması için toplam cümle sayısını saklar"""
+    marker = {
+        "pdf": os.path.basename(pdf_path),
+        "sayfalar": list(pages),
+        "toplam_cumle": processor.stats["toplam_cumle"],
+        "kayit": processor.record_count,
+        "cikti": processor.output_format,
+        "model": processor.model,
+        "bitis": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    tmp = f"{output_prefix}.done.json.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(marker, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, f"{output_prefix}.done.json")
+
+
 # ============== CLI ==============
 
 def main():
@@ -420,6 +2490,9 @@ def main():
                        help='Test: ilk N cümleyi işle')
     group.add_argument('--test', type=int, metavar='N',
                        help='Test: ilk N PDF sayfasını işle')
+    group.add_argument('--pages', type=parse_page_range, metavar='İLK-SON',
+                       help='Parça: yalnızca bu PDF sayfalarını işle (1 tabanlı, ikisi dahil); '
+                            'bitince <output>.done.json yazılır (bkz. parca_yonetici.py)')
     group.add_argument('--full', action='store_true',
                        help='Tam çalıştırma')
     
@@ -430,42 +2503,135 @@ def main():
                         help='Çıkış dosya adı (uzantısız)')
     parser.add_argument('--model', '-m', default=CONFIG.model,
                         help=f'Ollama model (default: {CONFIG.model})')
+    parser.add_argument('--host', action='append', dest='hosts', metavar='URL',
+                        help='Ollama sunucusu (tekrarlanabilir, ör. --host http://10.0.0.2:11434); '
+                             'verilmezse varsayılan sunucu / OLLAMA_HOST')
+    parser.add_argument('--fake-backend', action='store_true',
+                        help='Ollama yerine sahte backend (model gerekmez; test / benchmark için)')
+    parser.add_argument('--fake-latency', type=float, default=0.0, metavar='S',
+                        help='Sahte backend: istek başına gecikme, saniye (default: 0)')
+    parser.add_argument('--fake-failure-rate', type=float, default=0.0, metavar='P',
+                        help='Sahte backend: başarısız istek oranı 0-1 (default: 0)')
     parser.add_argument('--checkpoint-interval', type=int, default=CONFIG.checkpoint_interval,
                         help=f'Her kaç cümlede checkpoint (default: {CONFIG.checkpoint_interval})')
+    parser.add_argument('--stream', action='store_true',
+                        help='Akan yanıt: kaçak üretimi erken kes, num_predict cümle uzunluğundan')
+    parser.add_argument('--retry-dead-letters', action='store_true',
+                        help='Ölü mektup kuyruğundaki (boş / deneme hakkı bitmiş) cümleleri yine dene')
+    parser.add_argument('--batch', type=int, default=CONFIG.batch_size, metavar='N',
+                        help=f'İstek başına en fazla cümle; paketler model num_ctx bütçesine '
+                             f'göre kesilir (default: {CONFIG.batch_size} = kapalı)')
+    parser.add_argument('--output-format', choices=list(OUTPUT_EXTENSIONS), default='legacy',
+                        help='Nihai çıktı: legacy (JSON + TSV), sqlite (cumle / token tabloları) '
+                             'veya columnar (.szc); sonuc_donustur.py ile biçimler arası '
+                             'çevrilebilir (default: legacy)')
+    parser.add_argument('--plan-options', action='store_true',
+                        help='num_ctx / num_predict her istek için tahmini token sayısından, '
+                             'sabit kovalardan seçilir')
+    parser.add_argument('--ctx-buckets', default=",".join(map(str, CONFIG.ctx_buckets)),
+                        metavar='N,N,...',
+                        help=f'--plan-options num_ctx kovaları (default: '
+                             f'{",".join(map(str, CONFIG.ctx_buckets))})')
+    parser.add_argument('--predict-buckets', default=",".join(map(str, CONFIG.predict_buckets)),
+                        metavar='N,N,...',
+                        help=f'--plan-options num_predict kovaları (default: '
+                             f'{",".join(map(str, CONFIG.predict_buckets))})')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Akış modu: çıkarım/LLM/doğrulama/kayıt aşamaları eşzamanlı, bellek sabit')
+    parser.add_argument('--pdf-workers', type=int, default=CONFIG.pdf_workers, metavar='N',
+                        help='PDF çıkarımı için process sayısı (default: CPU sayısı - 1)')
+    parser.add_argument('--page-cache-dir', default=CONFIG.page_cache_dir,
+                        help=f'Sayfa metni önbellek dizini (default: {CONFIG.page_cache_dir})')
+    parser.add_argument('--no-page-cache', action='store_true',
+                        help='Sayfa metni önbelleğini kullanma')
+    parser.add_argument('--cache-file', default=CONFIG.cache_file,
+                        help=f'LLM yanıt önbelleği (default: {CONFIG.cache_file})')
+    parser.add_argument('--cache-max-mb', type=int, default=CONFIG.cache_max_mb,
+                        help=f'Önbellek boyut sınırı, MB (default: {CONFIG.cache_max_mb})')
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument('--no-cache', action='store_true',
+                             help='Önbelleği kullanma')
+    cache_group.add_argument('--cache-only', action='store_true',
+                             help='LLM çağırma, yalnızca önbellekteki yanıtları kullan')
+    parser.add_argument('--concurrency', '-c', type=int, default=CONFIG.concurrency,
+                        help=f'Aynı anda gönderilecek en fazla istek; sunucuda OLLAMA_NUM_PARALLEL '
+                             f'en az bu kadar olmalı (default: {CONFIG.concurrency})')
     
     args = parser.parse_args()
     
     # Checkpoint interval güncelle
     CONFIG.checkpoint_interval = args.checkpoint_interval
+    CONFIG.concurrency = max(1, args.concurrency)
+    CONFIG.batch_size = max(1, args.batch)
+    CONFIG.stream = args.stream
+    CONFIG.plan_options = args.plan_options
+    CONFIG.ctx_buckets = tuple(sorted(int(n) for n in args.ctx_buckets.split(",")))
+    CONFIG.predict_buckets = tuple(sorted(int(n) for n in args.predict_buckets.split(",")))
+    CONFIG.pdf_workers = max(0, args.pdf_workers)
+    CONFIG.page_cache_dir = "" if args.no_page_cache else args.page_cache_dir
     
     # Model kontrolü
     print(f"🔍 Model kontrol: {args.model}")
-    try:
-        ollama.show(args.model)
-        print(f"   ✅ Model mevcut")
-    except:
-        print(f"   ❌ Model bulunamadı!")
-        print(f"   Önce modeli oluşturun:")
-        print(f"   ollama create yasar-sozluk -f YasarKemalSozluk.modelfile")
-        sys.exit(1)
+    client = ollama
+    if args.fake_backend:
+        client = FakeBackend(latency=args.fake_latency, failure_rate=args.fake_failure_rate)
+        print(f"   🧪 Sahte backend (gecikme {args.fake_latency}s, "
+              f"hata oranı {args.fake_failure_rate:.0%})")
+    elif args.hosts:
+        client = BackendPool(args.hosts)
+        if not client.check_model(args.model):
+            print(f"   ❌ Modeli olan sunucu yok!")
+            sys.exit(1)
+    else:
+        try:
+            ollama.show(args.model)
+            print(f"   ✅ Model mevcut")
+        except:
+            print(f"   ❌ Model bulunamadı!")
+            print(f"   Önce modeli oluşturun:")
+            print(f"   ollama create yasar-sozluk -f YasarKemalSozluk.modelfile")
+            sys.exit(1)
     
-    processor = SozVarligiProcessor(model=args.model, output_prefix=args.output)
+    cache = None
+    if not args.no_cache:
+        options = {"temperature": CONFIG.temperature, "num_predict": CONFIG.num_predict,
+                   "stream": CONFIG.stream}
+        if CONFIG.plan_options:
+            options["plan"] = [CONFIG.ctx_buckets, CONFIG.predict_buckets]
+        cache = ResponseCache(
+            args.cache_file, args.model, get_model_digest(args.model, client), options,
+            max_bytes=args.cache_max_mb * 1024 * 1024)
+    
+    processor = SozVarligiProcessor(model=args.model, output_prefix=args.output,
+                                    cache=cache, cache_only=args.cache_only, client=client)
+    processor.retry_dead_letters = args.retry_dead_letters
+    processor.output_format = args.output_format
     
     if args.test_sentences:
         print(f"\n🧪 TEST: İlk {args.test_sentences} cümle")
-        sentences = extract_sentences_from_pdf(args.input, max_sentences=args.test_sentences)
-        processor.process_sentences(sentences)
+        extract_args = dict(max_sentences=args.test_sentences)
         
     elif args.test:
         print(f"\n🧪 TEST: İlk {args.test} PDF sayfası")
-        sentences = extract_sentences_from_pdf(args.input, start_page=0, end_page=args.test)
-        processor.process_sentences(sentences)
+        extract_args = dict(start_page=0, end_page=args.test)
+        
+    elif args.pages:
+        first, last = args.pages
+        print(f"\n🧩 PARÇA: PDF sayfa {first}-{last}")
+        extract_args = dict(start_page=first - 1, end_page=last)
         
     elif args.full:
         print("\n🚀 TAM ÇALIŞTIRMA")
-        sentences = extract_sentences_from_pdf(args.input)
-        processor.process_sentences(sentences)
-
+        extract_args = dict()
+    
+    if args.pipeline:
+        processor.process_stream(iter_sentences_from_pdf(args.input, **extract_args))
+    else:
+        # Liste modu da tembel çıkarımı kullanır: ilk istek ilk sayfa hazır olunca gider
+        processor.process_sentences(iter_sentences_from_pdf(args.input, **extract_args))
+    
+    if args.pages:
+        write_shard_marker(args.output, args.input, args.pages, processor)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Ortak token normalleştirme katmanı (birlestir.py, degerlendir.py).
+
+Her ham token bir kez Türkçe kurallarıyla küçük harfe çevrilir (İ→i, I→ı) ve
+tamsayı sözlüğüne eklenir (interning). Hizalama ve değerlendirme döngüleri
+dizgi yerine int dizileri üzerinde çalışır: eşitlik tek int karşılaştırması,
+fuzzy eşleşme için ilk 3 karakter ve uzunluk tabloları önceden hesaplanır.
+
+Sözlük process'e özeldir: id'ler yalnızca aynı process içinde karşılaştırılabilir
+(multiprocessing worker'ları kendi sözlüklerini tutar).
+
+Kullanım:
+    from normalizasyon import VOCAB, tr_lower
+    e_ids = VOCAB.encode(e_toks)
+    if e_ids[i] == q_ids[j] or VOCAB.fuzzy(e_ids[i], q_ids[j]): ...
+"""
+
+FUZZY_MIN_PREFIX = 3       # Fuzzy eşleşmede en az ortak önek (karakter)
+FUZZY_MIN_RATIO = 0.5      # ... ve kısa token'ın en az bu oranı
+
+
+def tr_lower(s):
+    """Türkçe uyumlu lowercase — İ→i, I→ı"""
+    return s.replace('İ', 'i').replace('I', 'ı').lower()
+
+
+class Vocab:
+    """
+    Normalleştirilmiş token ↔ int sözlüğü.
+
+    strings[id]  normalleştirilmiş dizgi
+    lengths[id]  karakter uzunluğu (birleşik eşleşme ön elemesi)
+    prefix[id]   ilk FUZZY_MIN_PREFIX karakter; daha kısa token'larda None
+    """
+
+    def __init__(self):
+        self.index = {}      # normalleştirilmiş dizgi → id
+        self.strings = []
+        self.lengths = []
+        self.prefix = []
+        self._raw = {}       # ham dizgi → id (tr_lower her dizgi için bir kez)
+        self._fuzzy = {}     # (küçük id, büyük id) → bool
+
+    def __len__(self):
+        return len(self.strings)
+
+    def intern(self, norm):
+        """Normalleştirilmiş dizginin id'si; yoksa ekle"""
+        idx = self.index.get(norm)
+        if idx is None:
+            idx = len(self.strings)
+            self.index[norm] = idx
+            self.strings.append(norm)
+            self.lengths.append(len(norm))
+            self.prefix.append(norm[:FUZZY_MIN_PREFIX] if len(norm) >= FUZZY_MIN_PREFIX else None)
+        return idx
+
+    def id(self, raw):
+        """Ham token'ın id'si (Türkçe küçük harf)"""
+        idx = self._raw.get(raw)
+        if idx is None:
+            idx = self._raw[raw] = self.intern(tr_lower(raw))
+        return idx
+
+    def encode(self, tokens):
+        """Ham token listesi → id listesi"""
+        raw, ident = self._raw, self.id
+        return [raw[t] if t in raw else ident(t) for t in tokens]
+
+    def norm(self, raw):
+        """Ham token'ın normalleştirilmiş dizgisi"""
+        return self.strings[self.id(raw)]
+
+    def fuzzy(self, a, b):
+        """
+        Gevşek eşleşme: aynı id veya yeterli ortak önek — en az FUZZY_MIN_PREFIX
+        karakter ve kısa olanın FUZZY_MIN_RATIO'su. İlk harf dahil önek eşit olmalı.
+        """
+        if a == b:
+            return True
+        pa = self.prefix[a]
+        if pa is None or pa != self.prefix[b]:
+            return False
+        key = (a, b) if a < b else (b, a)
+        hit = self._fuzzy.get(key)
+        if hit is None:
+            sa, sb = self.strings[a], self.strings[b]
+            common = FUZZY_MIN_PREFIX
+            for ca, cb in zip(sa[common:], sb[common:]):
+                if ca != cb:
+                    break
+                common += 1
+            hit = self._fuzzy[key] = common >= min(len(sa), len(sb)) * FUZZY_MIN_RATIO
+        return hit
+
+    def joins(self, ids, start, count, target):
+        """ids[start:start+count] art arda birleşince target'a eşit mi?"""
+        lengths = self.lengths
+        part = ids[start:start + count]
+        if sum(lengths[i] for i in part) != lengths[target]:
+            return False
+        strings = self.strings
+        return "".join(strings[i] for i in part) == strings[target]
+
+
+VOCAB = Vocab()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Parçalı (sharded) çalışma yöneticisi.
+Bir veya daha fazla PDF'i (ör. dört cilt) sayfa aralıklarına böler, her parçayı
+bağımsız bir `ince_memed_v3_checkpoint.py --pages İLK-SON` işçisi olarak çalıştırır
+ve bitmiş parçaları cumle_id'leri tutarlı tek bir sonuçta birleştirir.
+
+Manifest (JSON):
+    {
+      "model": "yasar-sozluk",
+      "cikti_dizini": "parcalar",
+      "pdfler": {"cilt1.pdf": {"sayfa_sayisi": 412}, ...},   # sıra = numaralandırma sırası
+      "parcalar": [
+        {"id": "cilt1.0001-0050", "pdf": "cilt1.pdf", "sayfalar": [1, 50],
+         "host": "http://10.0.0.2:11434"},
+        ...
+      ]
+    }
+Parça çıktıları <cikti_dizini>/<id>.* dosyalarıdır; parça bitince işçi
+<id>.done.json yazar (parçanın toplam cümle sayısı ile). Bu dosyası olmayan parça
+bitmemiş sayılır ve `run` ile yeniden gönderilir; işçi kendi checkpoint'inden devam eder.
+
+Birleştirmede her parçanın cumle_id'sine, manifest sırasında (PDF sırası, sonra ilk
+sayfa) önceki parçaların toplam cümle sayısı eklenir: bir cildin parçaları, cildin
+tek parça çalıştırılmasıyla aynı numaraları alır; sonraki ciltler kaldığı yerden sayar.
+
+Kullanım:
+    # 50 sayfalık parçalar, iki sunucuya dağıtılmış
+    python parca_yonetici.py plan cilt1.pdf cilt2.pdf --pages-per-shard 50 \\
+        --host http://10.0.0.2:11434 --host http://10.0.0.3:11434 -o manifest.json
+
+    python parca_yonetici.py status manifest.json
+    python parca_yonetici.py run manifest.json -j 2 -- --stream --output-format columnar
+    python parca_yonetici.py run manifest.json --dry-run      # başka makineler için komutlar
+    python parca_yonetici.py merge manifest.json -o ince_memed.json -o ince_memed.tsv
+"""
+
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pdfplumber
+
+from ince_memed_v3_checkpoint import CONFIG, OUTPUT_EXTENSIONS, open_results, write_results
+
+WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ince_memed_v3_checkpoint.py")
+
+
+# ─── Manifest ────────────────────────────────────────────────
+
+def load_manifest(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def shard_prefix(manifest, shard):
+    return os.path.join(manifest.get("cikti_dizini", "parcalar"), shard["id"])
+
+
+def ordered_shards(manifest):
+    """Numaralandırma sırası: manifest'teki PDF sırası, sonra ilk sayfa"""
+    pdf_order = {pdf: i for i, pdf in enumerate(manifest["pdfler"])}
+    return sorted(manifest["parcalar"],
+                  key=lambda s: (pdf_order.get(s["pdf"], len(pdf_order)), s["sayfalar"][0]))
+
+
+def check_coverage(manifest):
+    """Çakışan, eksik veya PDF dışına taşan sayfa aralıkları -> sorun listesi"""
+    problems = []
+    ids = [s["id"] for s in manifest["parcalar"]]
+    for dup in sorted({i for i in ids if ids.count(i) > 1}):
+        problems.append(f"Aynı id birden fazla parçada: {dup}")
+
+    by_pdf = {}
+    for shard in ordered_shards(manifest):
+        if shard["pdf"] not in manifest["pdfler"]:
+            problems.append(f"{shard['id']}: PDF manifest'te yok: {shard['pdf']}")
+            continue
+        by_pdf.setdefault(shard["pdf"], []).append(shard)
+
+    for pdf, info in manifest["pdfler"].items():
+        n_pages = info.get("sayfa_sayisi")
+        expected = 1
+        prev = None
+        for shard in by_pdf.get(pdf, []):
+            first, last = shard["sayfalar"]
+            if first > expected:
+                problems.append(f"{pdf}: {expected}-{first - 1}. sayfalar hiçbir parçada yok")
+            elif first < expected:
+                problems.append(f"{pdf}: {shard['id']} ile {prev['id']} çakışıyor "
+                                f"({first}-{min(last, expected - 1)}. sayfalar)")
+            if n_pages and last > n_pages:
+                problems.append(f"{pdf}: {shard['id']} PDF dışına taşıyor "
+                                f"(son sayfa {last} > {n_pages})")
+            expected = max(expected, last + 1)
+            prev = shard
+        if n_pages and expected <= n_pages:
+            problems.append(f"{pdf}: {expected}-{n_pages}. sayfalar hiçbir parçada yok")
+    return problems
+
+
+def shard_state(manifest, shard):
+    """('bitti', işaret) / ('yarım', kayıt sayısı) / ('başlamadı', None) / ('uyumsuz', açıklama)"""
+    prefix = shard_prefix(manifest, shard)
+    marker_file = f"{prefix}.done.json"
+    if os.path.exists(marker_file):
+        with open(marker_file, encoding="utf-8") as f:
+            marker = json.load(f)
+        if marker["sayfalar"] != shard["sayfalar"] or marker["pdf"] != os.path.basename(shard["pdf"]):
+            return "uyumsuz", (f"işaret {marker['pdf']} {marker['sayfalar']}, "
+                               f"manifest {shard['pdf']} {shard['sayfalar']}")
+        return "bitti", marker
+    journal = f"{prefix}.journal.jsonl"
+    if os.path.exists(journal):
+        with open(journal, "rb") as f:
+            return "yarım", sum(1 for line in f if line.startswith((b'{"r"', b'{"data"')))
+    return "başlamadı", None
+
+
+def shard_results(manifest, shard, marker):
+    """Bitmiş parçanın sonuç dosyası: işaretteki çıktı biçimi, yoksa günlük"""
+    prefix = shard_prefix(manifest, shard)
+    for ext in OUTPUT_EXTENSIONS.get(marker.get("cikti", "legacy"), ())[:1]:
+        if os.path.exists(prefix + ext):
+            return prefix + ext
+    return f"{prefix}.journal.jsonl"
+
+
+# ─── Komutlar ────────────────────────────────────────────────
+
+def cmd_plan(args):
+    manifest = {"model": args.model, "cikti_dizini": args.output_dir, "pdfler": {}, "parcalar": []}
+    hosts = args.hosts or [None]
+    for pdf in args.pdfs:
+        with pdfplumber.open(pdf) as doc:
+            n_pages = len(doc.pages)
+        manifest["pdfler"][pdf] = {"sayfa_sayisi": n_pages}
+        stem = os.path.splitext(os.path.basename(pdf))[0]
+        for first in range(1, n_pages + 1, args.pages_per_shard):
+            last = min(n_pages, first + args.pages_per_shard - 1)
+            shard = {"id": f"{stem}.{first:04d}-{last:04d}", "pdf": pdf, "sayfalar": [first, last]}
+            host = hosts[len(manifest["parcalar"]) % len(hosts)]
+            if host:
+                shard["host"] = host
+            manifest["parcalar"].append(shard)
+        print(f"📄 {pdf}: {n_pages} sayfa")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"📁 Manifest: {args.output} ({len(manifest['parcalar'])} parça)")
+
+
+def report_coverage(manifest):
+    problems = check_coverage(manifest)
+    for p in problems:
+        print(f"   ❌ {p}")
+    return problems
+
+
+def cmd_status(args):
+    manifest = load_manifest(args.manifest)
+    counts = {}
+    for shard in ordered_shards(manifest):
+        state, info = shard_state(manifest, shard)
+        counts[state] = counts.get(state, 0) + 1
+        if state == "bitti":
+            detail = f"{info['toplam_cumle']} cümle, {info['kayit']} kayıt ({info['bitis']})"
+        elif state == "yarım":
+            detail = f"checkpoint'te {info} kayıt"
+        else:
+            detail = info or ""
+        icon = {"bitti": "✅", "yarım": "⏸️ ", "başlamadı": "⬜", "uyumsuz": "⚠️ "}[state]
+        print(f"{icon} {shard['id']:<28} {state:<10} {detail}")
+
+    print("\n📊 " + ", ".join(f"{n} {state}" for state, n in counts.items()))
+    if not report_coverage(manifest):
+        print("   ✅ Sayfa aralıkları eksiksiz ve çakışmasız")
+
+
+def worker_command(manifest, shard, extra):
+    cmd = [sys.executable, WORKER, "--pages", "{}-{}".format(*shard["sayfalar"]),
+           "-i", shard["pdf"], "-o", shard_prefix(manifest, shard),
+           "-m", manifest.get("model", CONFIG.model)]
+    if shard.get("host"):
+        cmd += ["--host", shard["host"]]
+    # PageTextCache tek yazıcı varsayar; -j ile aynı PDF'in parçaları aynı
+    # <sha>.pages dosyasına kilitsiz eklerdi. Her parça kendi dizinini kullanır
+    # (yeniden gönderilen parça yine kendi önbelleğinden okur)
+    if not any(a in ("--no-page-cache", "--page-cache-dir") or a.startswith("--page-cache-dir=")
+               for a in extra):
+        cmd += ["--page-cache-dir", f"{shard_prefix(manifest, shard)}.sayfa_onbellek"]
+    return cmd + extra
+
+
+def cmd_run(args):
+    manifest = load_manifest(args.manifest)
+    if report_coverage(manifest) and not args.force:
+        print("❌ Manifest sorunlu; düzeltin veya --force kullanın")
+        sys.exit(1)
+
+    extra = args.worker_args
+    pending = []
+    for shard in ordered_shards(manifest):
+        if args.only and shard["id"] not in args.only:
+            continue
+        state, info = shard_state(manifest, shard)
+        if state == "uyumsuz":
+            # Eski checkpoint'in cumle_id'leri başka sayfa aralığına ait; devam edilemez
+            print(f"   ⚠️  {shard['id']} atlandı ({info}); "
+                  f"{shard_prefix(manifest, shard)}.* dosyalarını silip tekrar çalıştırın")
+        elif state != "bitti":
+            pending.append(shard)
+    if not pending:
+        print("✅ Gönderilecek parça yok")
+        return
+
+    if args.dry_run:
+        for shard in pending:
+            print(shlex.join(worker_command(manifest, shard, extra)))
+        return
+
+    os.makedirs(manifest.get("cikti_dizini", "parcalar"), exist_ok=True)
+    print(f"🚀 {len(pending)} parça gönderiliyor ({args.jobs} eşzamanlı)")
+
+    def run_shard(shard):
+        log_file = f"{shard_prefix(manifest, shard)}.log"
+        with open(log_file, "a", encoding="utf-8") as log:
+            code = subprocess.call(worker_command(manifest, shard, extra),
+                                   stdout=log, stderr=subprocess.STDOUT)
+        return shard, code, log_file
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        for shard, code, log_file in pool.map(run_shard, pending):
+            state = shard_state(manifest, shard)[0]
+            if code == 0 and state == "bitti":
+                print(f"   ✅ {shard['id']}")
+            else:
+                failed += 1
+                print(f"   ❌ {shard['id']} (çıkış kodu {code}, günlük: {log_file})")
+
+    if failed:
+        print(f"⚠️  {failed} parça bitmedi; tekrar `run` ile yalnızca onlar gönderilir")
+        sys.exit(1)
+
+
+def merge_stats(total, stats):
+    for k, v in stats.items():
+        if isinstance(v, dict):
+            merge_stats(total.setdefault(k, {}), v)
+        elif isinstance(v, (int, float)):
+            total[k] = total.get(k, 0) + v
+    return total
+
+
+def cmd_merge(args):
+    manifest = load_manifest(args.manifest)
+    problems = report_coverage(manifest)
+    shards = ordered_shards(manifest)
+    unfinished = [s["id"] for s in shards if shard_state(manifest, s)[0] != "bitti"]
+    for shard_id in unfinished:
+        print(f"   ❌ Bitmemiş parça: {shard_id}")
+    if problems or unfinished:
+        print("❌ Birleştirilemedi: cumle_id'ler ancak tüm parçalar eksiksiz bitince tutarlı olur")
+        sys.exit(1)
+
+    stats = {}
+    sources = []
+    offset = 0
+    records = []
+    for shard in shards:
+        _, marker = shard_state(manifest, shard)
+        meta, shard_records = open_results(shard_results(manifest, shard, marker))
+        n = 0
+        for record in shard_records:
+            record = dict(record, cumle_id=record["cumle_id"] + offset)
+            records.append(record)
+            n += 1
+        merge_stats(stats, meta.get("stats", {}))
+        sources.append({"id": shard["id"], "pdf": shard["pdf"], "sayfalar": shard["sayfalar"],
+                        "cumle_id": [offset + 1, offset + marker["toplam_cumle"]]})
+        print(f"   📦 {shard['id']}: {n} kayıt, cumle_id {offset + 1}-{offset + marker['toplam_cumle']}")
+        offset += marker["toplam_cumle"]
+
+    stats["toplam_cumle"] = offset
+    meta = {"model": manifest.get("model", CONFIG.model), "stats": stats, "parcalar": sources}
+    for path in args.outputs:
+        write_results(path, meta, records)
+        print(f"📁 {path}")
+    print(f"✅ {len(shards)} parça, {len(records)} kayıt, {offset} cümle")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parçalı çalışma yöneticisi")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("plan", help="PDF'leri sayfa aralıklarına bölüp manifest yaz")
+    p.add_argument("pdfs", nargs="+", help="PDF'ler (numaralandırma sırasıyla)")
+    p.add_argument("--pages-per-shard", type=int, default=50)
+    p.add_argument("--host", action="append", dest="hosts", metavar="URL",
+                   help="Ollama sunucusu; parçalara sırayla atanır (tekrarlanabilir)")
+    p.add_argument("--model", "-m", default=CONFIG.model)
+    p.add_argument("--output-dir", default="parcalar", help="Parça çıktı dizini")
+    p.add_argument("--output", "-o", default="manifest.json")
+    p.set_defaults(func=cmd_plan)
+
+    p = sub.add_parser("status", help="Parça durumları ve sayfa kapsamı")
+    p.add_argument("manifest")
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser("run", help="Bitmemiş parçaları çalıştır (kaldıkları yerden); "
+                                   "-- sonrası işçiye aynen geçer (ör. -- --stream --batch 4)")
+    p.add_argument("manifest")
+    p.add_argument("--jobs", "-j", type=int, default=1, help="Aynı anda çalışan parça")
+    p.add_argument("--only", action="append", metavar="ID", help="Yalnızca bu parça(lar)")
+    p.add_argument("--dry-run", action="store_true",
+                   help="Çalıştırma, komutları yazdır (başka makinelere dağıtmak için)")
+    p.add_argument("--force", action="store_true", help="Kapsam sorunlarına rağmen çalıştır")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("merge", help="Bitmiş parçaları tek sonuçta birleştir")
+    p.add_argument("manifest")
+    p.add_argument("--output", "-o", action="append", dest="outputs", required=True,
+                   help="Çıktı (.json, .tsv, .sqlite, .szc; tekrarlanabilir)")
+    p.set_defaults(func=cmd_merge)
+
+    # "--" sonrası argparse'a hiç verilmez, işçi argümanlarıdır
+    argv = sys.argv[1:]
+    worker_args = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, worker_args = argv[:split], argv[split + 1:]
+    args = parser.parse_args(argv)
+    args.worker_args = worker_args
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
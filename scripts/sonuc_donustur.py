@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Sonuç biçimleri arası dönüştürücü.
+ince_memed_v3_checkpoint.py çıktılarını okur, uzantıya göre istenen biçimlerde yazar:
+
+    .json           eski JSON çıktısı ({"meta": ..., "data": [...]}, indent=2)
+    .tsv            eski TSV çıktısı (token başına satır, cümle metni tekrarlı)
+    .sqlite         normalleştirilmiş cumle / token tabloları
+    .szc            sütun tabanlı ikili dosya (sözlük kodlu token alanları)
+    .journal.jsonl  (yalnızca girdi) checkpoint günlüğü
+
+Kullanım:
+    # Sütunlu dosyadan eski JSON + TSV
+    python sonuc_donustur.py ince_memed_sozluk.szc ince_memed_sozluk.json ince_memed_sozluk.tsv
+
+    # Eski JSON'dan SQLite
+    python sonuc_donustur.py ince_memed_sozluk.json ince_memed_sozluk.sqlite
+"""
+
+import argparse
+import os
+import time
+
+from ince_memed_v3_checkpoint import CONFIG, open_results, write_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sonuç biçimleri arası dönüştürücü")
+    parser.add_argument("input", help="Girdi (.json, .journal.jsonl, .sqlite, .szc)")
+    parser.add_argument("outputs", nargs="+", help="Çıktı(lar) (.json, .tsv, .sqlite, .szc)")
+    parser.add_argument("--model", "-m", default=CONFIG.model,
+                        help=f"Girdide model bilgisi yoksa meta'ya yazılacak model "
+                             f"(default: {CONFIG.model})")
+    args = parser.parse_args()
+
+    start = time.time()
+    meta, records = open_results(args.input)
+    records = list(records)
+    meta = {"model": meta.get("model", args.model), "stats": meta.get("stats", {})}
+    print(f"📂 {args.input}: {len(records):,} kayıt, "
+          f"{sum(len(r['tokens']) for r in records):,} token "
+          f"({os.path.getsize(args.input) / 1e6:.1f} MB, {time.time() - start:.2f}s)")
+
+    for path in args.outputs:
+        start = time.time()
+        write_results(path, meta, records)
+        print(f"📁 {path}: {os.path.getsize(path) / 1e6:.1f} MB ({time.time() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Uyumsuzluk küpü sorguları (degerlendir.py'nin yazdığı degerlendirme.sqlite).
+birlesik.tsv / degerlendirme.tsv yeniden taranmaz; her sorgu indeksli tablodan okunur.
+
+Kullanım:
+    python uyumsuzluk_sorgu.py ozet                     # etiket dağılımı
+    python uyumsuzluk_sorgu.py lemma -n 20 --min 10     # en çok uyuşmayan elemantr lemmaları
+    python uyumsuzluk_sorgu.py cift -n 20               # en sık elemantr → qwen lemma farkları
+    python uyumsuzluk_sorgu.py cift --lemma gel         # bir lemma'nın qwen karşılıkları
+    python uyumsuzluk_sorgu.py sayfa -n 20 --min 50     # uyumu en düşük sayfalar
+    python uyumsuzluk_sorgu.py sayfa 12                 # elemantr 12. sayfanın dökümü
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+from degerlendir import EVAL_LABELS, LABELS
+
+
+def pct(a, b):
+    return f"{a / b * 100:5.1f}%" if b else "    -"
+
+
+def cmd_ozet(conn, args):
+    counts = dict(conn.execute("SELECT etiket, n FROM etiket"))
+    total = sum(counts.values())
+    evaluable = sum(counts.get(label, 0) for label in EVAL_LABELS)
+    print(f"Toplam satır: {total:,}   Değerlendirilebilir: {evaluable:,}   "
+          f"Uyum: {pct(counts.get('ayni', 0), evaluable).strip()}")
+    for label in LABELS:
+        print(f"  {label:<18} {counts.get(label, 0):>10,}  {pct(counts.get(label, 0), total)}")
+    n_lemma = conn.execute("SELECT COUNT(*) FROM lemma").fetchone()[0]
+    n_pair = conn.execute("SELECT COUNT(*) FROM cift").fetchone()[0]
+    n_page = conn.execute("SELECT COUNT(*) FROM sayfa").fetchone()[0]
+    print(f"Küp: {n_lemma:,} lemma, {n_pair:,} lemma çifti, {n_page:,} sayfa")
+
+
+def cmd_lemma(conn, args):
+    rows = conn.execute(
+        "SELECT lemma, degerlendirilir, ayni, farkli, farkli_belirsiz, token_farkli_x, uyumsuz "
+        "FROM lemma WHERE degerlendirilir >= ? ORDER BY uyumsuz DESC LIMIT ?",
+        (args.min, args.n)).fetchall()
+    print(f"{'Lemma':<20} {'Değ.':>7} {'Uyumsuz':>8} {'Oran':>6} "
+          f"{'farkli':>7} {'belirsiz':>8} {'token_x':>7}")
+    for lemma, ev, _, fa, fb, tx, bad in rows:
+        print(f"{lemma:<20} {ev:>7,} {bad:>8,} {pct(bad, ev):>6} {fa:>7,} {fb:>8,} {tx:>7,}")
+
+
+def cmd_cift(conn, args):
+    where, params = "", []
+    if args.lemma:
+        where, params = "WHERE e_lemma = ?", [args.lemma]
+    elif args.qwen:
+        where, params = "WHERE q_lemma = ?", [args.qwen]
+    rows = conn.execute(
+        f"SELECT e_lemma, q_lemma, farkli, farkli_belirsiz, token_farkli_x, n FROM cift "
+        f"{where} ORDER BY n DESC LIMIT ?", (*params, args.n)).fetchall()
+    print(f"{'Elemantr':<20}    {'Qwen':<20} {'n':>7} {'farkli':>7} {'belirsiz':>8} {'token_x':>7}")
+    for e, q, fa, fb, tx, n in rows:
+        print(f"{e:<20} →  {q:<20} {n:>7,} {fa:>7,} {fb:>8,} {tx:>7,}")
+
+
+def cmd_sayfa(conn, args):
+    if not conn.execute("SELECT 1 FROM sayfa LIMIT 1").fetchone():
+        print("Küpte sayfa bilgisi yok (birlestir manifest'i olmadan değerlendirilmiş).")
+        return
+    columns = ", ".join(LABELS)
+    if args.sayfa is not None:
+        rows = conn.execute(f"SELECT sira, e_sayfa, q_sayfa, {columns}, degerlendirilir, uyum "
+                            f"FROM sayfa WHERE e_sayfa = ?", (args.sayfa,)).fetchall()
+        if not rows:
+            print(f"Elemantr {args.sayfa}. sayfa küpte yok.")
+        for sira, e_no, q_no, *rest in rows:
+            counts, evaluable, _ = rest[:len(LABELS)], rest[len(LABELS)], rest[-1]
+            print(f"Elemantr s.{e_no} ↔ qwen s.{q_no if q_no is not None else '-'} "
+                  f"(birlesik.tsv'de {sira}. sayfa)")
+            print(f"  Değerlendirilebilir: {evaluable:,}   Uyum: {pct(counts[0], evaluable).strip()}")
+            for label, c in zip(LABELS, counts):
+                if c:
+                    print(f"  {label:<18} {c:>7,}")
+        return
+
+    rows = conn.execute(
+        "SELECT e_sayfa, q_sayfa, degerlendirilir, ayni, farkli, farkli_belirsiz, "
+        "token_farkli_x, bos_e, bos_q, uyum FROM sayfa "
+        "WHERE uyum IS NOT NULL AND degerlendirilir >= ? ORDER BY uyum LIMIT ?",
+        (args.min, args.n)).fetchall()
+    print(f"{'E s.':>6} {'Q s.':>6} {'Değ.':>6} {'Uyum':>6} {'farkli':>7} {'belirsiz':>8} "
+          f"{'token_x':>7} {'bos_e':>6} {'bos_q':>6}")
+    for e_no, q_no, ev, _, fa, fb, tx, be, bq, uyum in rows:
+        print(f"{e_no if e_no is not None else '-':>6} {q_no if q_no is not None else '-':>6} "
+              f"{ev:>6,} {uyum * 100:>5.1f}% {fa:>7,} {fb:>8,} {tx:>7,} {be:>6,} {bq:>6,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uyumsuzluk küpü sorguları")
+    parser.add_argument("--db", "-d", default="degerlendirme.sqlite",
+                        help="degerlendir.py küpü (default: degerlendirme.sqlite)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("ozet", help="Etiket dağılımı")
+
+    p = sub.add_parser("lemma", help="En çok uyuşmayan elemantr lemmaları")
+    p.add_argument("-n", type=int, default=20)
+    p.add_argument("--min", type=int, default=1, help="En az değerlendirilebilir satır")
+
+    p = sub.add_parser("cift", help="En sık elemantr → qwen lemma farkları")
+    p.add_argument("-n", type=int, default=20)
+    p.add_argument("--lemma", help="Yalnızca bu elemantr lemma'sı")
+    p.add_argument("--qwen", help="Yalnızca bu qwen lemma'sı")
+
+    p = sub.add_parser("sayfa", help="Uyumu en düşük sayfalar veya tek sayfa dökümü")
+    p.add_argument("sayfa", type=int, nargs="?", help="Elemantr sayfa numarası")
+    p.add_argument("-n", type=int, default=20)
+    p.add_argument("--min", type=int, default=1, help="En az değerlendirilebilir satır")
+
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"HATA: {args.db} bulunamadı! Önce: python degerlendir.py")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    {"ozet": cmd_ozet, "lemma": cmd_lemma, "cift": cmd_cift, "sayfa": cmd_sayfa}[args.command](conn, args)
+    conn.close()
+    print(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()